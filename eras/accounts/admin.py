@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.cache import cache
+from django.db import transaction
 from django.utils.html import format_html
 from .models import User, CitizenProfile, ServiceProviderProfile, ServiceProviderRating, EmergencyResponse
+from .pagination import CachedCountPaginator, invalidate_cached_counts
 
 class CustomUserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'user_type', 'phone_number', 'is_staff', 'date_joined')
@@ -18,10 +21,16 @@ class CustomUserAdmin(BaseUserAdmin):
 
 @admin.register(ServiceProviderProfile)
 class ServiceProviderProfileAdmin(admin.ModelAdmin):
-    list_display = ('organization_name', 'service_type', 'city', 'current_status', 'is_verified', 'created_at')
-    list_filter = ('service_type', 'current_status', 'is_verified', 'city', 'created_at')
-    search_fields = ('organization_name', 'email', 'contact_number', 'registration_number')
+    list_display = ('organization_name', 'service_type', 'city', 'current_status', 'is_verified',
+                    'average_rating', 'rating_count', 'created_at')
+    list_filter = ('service_type', 'current_status', 'is_verified', 'created_at')
+    search_fields = ('organization_name', 'email', 'contact_number', 'registration_number', 'city')
+    search_help_text = 'Search by organization name, email, contact number, registration number or city.'
     readonly_fields = ('created_at', 'updated_at', 'profile_completed_at')
+    autocomplete_fields = ('user', 'verified_by')
+    paginator = CachedCountPaginator
+    # The "N total" count is a second, uncached COUNT(*) of the whole table
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -53,25 +62,41 @@ class ServiceProviderProfileAdmin(admin.ModelAdmin):
         }),
     )
     
+    def average_rating(self, obj):
+        return round(obj.avg_rating, 1) if obj.rating_count else '-'
+    average_rating.short_description = "Avg rating"
+    average_rating.admin_order_field = 'avg_rating'
+
     actions = ['verify_providers', 'unverify_providers', 'activate_providers', 'deactivate_providers']
     
+    def _update_selected(self, queryset, **values):
+        # Re-select by primary key only so the UPDATE doesn't carry the
+        # changelist's joins and ordering. update() sends no post_save, so
+        # expire the cached directory counts and cities here.
+        pks = queryset.values_list('pk', flat=True)
+        with transaction.atomic():
+            updated = queryset.model.objects.filter(pk__in=pks).update(**values)
+        invalidate_cached_counts(queryset.model)
+        cache.delete(queryset.model.DIRECTORY_CITIES_CACHE_KEY)
+        return updated
+
     def verify_providers(self, request, queryset):
-        updated = queryset.update(is_verified=True)
+        updated = self._update_selected(queryset, is_verified=True)
         self.message_user(request, f'{updated} providers verified successfully.')
     verify_providers.short_description = "Verify selected providers"
     
     def unverify_providers(self, request, queryset):
-        updated = queryset.update(is_verified=False)
+        updated = self._update_selected(queryset, is_verified=False)
         self.message_user(request, f'{updated} providers unverified.')
     unverify_providers.short_description = "Unverify selected providers"
     
     def activate_providers(self, request, queryset):
-        updated = queryset.update(current_status='active')
+        updated = self._update_selected(queryset, current_status='active')
         self.message_user(request, f'{updated} providers activated.')
     activate_providers.short_description = "Activate selected providers"
     
     def deactivate_providers(self, request, queryset):
-        updated = queryset.update(current_status='inactive')
+        updated = self._update_selected(queryset, current_status='inactive')
         self.message_user(request, f'{updated} providers deactivated.')
     deactivate_providers.short_description = "Deactivate selected providers"
 
@@ -79,28 +104,37 @@ class ServiceProviderProfileAdmin(admin.ModelAdmin):
 @admin.register(ServiceProviderRating)
 class ServiceProviderRatingAdmin(admin.ModelAdmin):
     list_display = ('service_provider', 'user', 'rating', 'created_at')
-    list_filter = ('rating', 'created_at', 'service_provider__service_type')
+    list_filter = ('rating', 'created_at')
     search_fields = ('service_provider__organization_name', 'user__username')
     readonly_fields = ('created_at',)
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('service_provider', 'user')
+    list_select_related = ('service_provider', 'user')
+    autocomplete_fields = ('service_provider',)
 
 
 @admin.register(EmergencyResponse)
 class EmergencyResponseAdmin(admin.ModelAdmin):
     list_display = ('incident_id', 'service_provider', 'status', 'response_time', 'created_at')
-    list_filter = ('status', 'created_at', 'service_provider__service_type')
+    list_filter = ('status', 'created_at')
     search_fields = ('incident_id', 'service_provider__organization_name')
     readonly_fields = ('created_at',)
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('service_provider')
+    list_select_related = ('service_provider',)
+    autocomplete_fields = ('service_provider',)
 
 
 # admin.site.unregister(User)
 admin.site.register(User, CustomUserAdmin)
 
-admin.site.register(CitizenProfile)
+
+@admin.register(CitizenProfile)
+class CitizenProfileAdmin(admin.ModelAdmin):
+    list_display = ('username', 'blood_group', 'city', 'available_to_donate')
+    list_select_related = ('user',)
+    search_fields = ('user__username', 'city')
+
+    def username(self, obj):
+        return obj.user.username
+    username.short_description = "User"
+    username.admin_order_field = 'user__username'
+
 
 # Register your models here.
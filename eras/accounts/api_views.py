@@ -3,7 +3,6 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
-from django.db.models import Count, Avg
 from .models import CitizenProfile, ServiceProviderProfile, BloodRequest
 from disasters.models import Disaster, DisasterAlert
 from disasters.serializers import DisasterSerializer
@@ -115,7 +114,7 @@ def api_dashboard(request):
                 'total_requests': user_blood_requests.count(),
                 'open_requests': user_blood_requests.filter(status='open').count(),
             }
-            data['profile_complete'] = profile.is_profile_complete()
+            data['profile_complete'] = profile.profile_complete
             
             recent_disasters = Disaster.objects.filter(status='approved').order_by('-created_at')[:5]
             data['recent_disasters'] = DisasterSerializer(recent_disasters, many=True).data
@@ -127,7 +126,7 @@ def api_dashboard(request):
         try:
             profile = user.service_provider_profile
             data['capacity_percentage'] = profile.get_capacity_percentage()
-            data['avg_rating'] = profile.ratings.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
+            data['avg_rating'] = profile.avg_rating
             
             disaster_stats = {
                 'reported': Disaster.objects.filter(reporter=user).count(),
@@ -137,7 +136,7 @@ def api_dashboard(request):
             
             recent_disasters = Disaster.objects.filter(status='approved').order_by('-created_at')[:5]
             data['recent_disasters'] = DisasterSerializer(recent_disasters, many=True).data
-            data['profile_complete'] = profile.is_profile_complete()
+            data['profile_complete'] = profile.profile_complete
         except Exception as e:
             data['error'] = str(e)
             
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend that loads the session user together with its profile."""
+
+    def get_user(self, user_id):
+        # Views read request.user.<profile> on almost every page. A profile
+        # the user doesn't have is cached as missing, so the accessor still
+        # raises DoesNotExist without another query.
+        try:
+            user = UserModel._default_manager.select_related(
+                'citizen_profile', 'service_provider_profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
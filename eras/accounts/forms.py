@@ -1,28 +1,87 @@
+import copy
+import re
+from collections import Counter
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.core.validators import RegexValidator
-from .models import User, CitizenProfile, ServiceProviderProfile, ServiceProviderRating
+from django.db import transaction
+from .models import BLOOD_GROUPS, normalize_phone, User, CitizenProfile, ServiceProviderProfile, ServiceProviderRating
+from .pagination import invalidate_cached_counts
+
+# Canonical phone numbers are digits after an optional '+' and must fit the
+# 15-character columns; raw input gets room for the separators
+# normalize_phone() strips before either check runs.
+PHONE_RE = re.compile(r'^\+?\d+$')
+PHONE_MAX_LENGTH = 15
+PHONE_INPUT_MAX_LENGTH = 20
+
+# Stricter format for provider contact numbers, shared by every field using it
+contact_number_validator = RegexValidator(
+    regex=re.compile(r'^\+?1?\d{9,15}$'),
+    message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
+)
+
+
+def clean_phone(value):
+    """Normalize ``value``, then check the canonical number."""
+    if not value:
+        return value
+    # Canonical form, so unique checks see '+880 17...' and '+88017...' as one
+    value = normalize_phone(value)
+    if not PHONE_RE.match(value):
+        raise forms.ValidationError("Please enter a valid phone number.")
+    if len(value) > PHONE_MAX_LENGTH:
+        raise forms.ValidationError(
+            f"Ensure this phone number has at most {PHONE_MAX_LENGTH} characters "
+            f"without separators (it has {len(value)}).")
+    return value
+
+
+def form_control(form_class):
+    """Give every widget of ``form_class`` the form-control class once, at class creation."""
+    # base_fields can share Field objects with parent forms (e.g. Django's
+    # UserCreationForm password fields), so style a private copy.
+    form_class.base_fields = copy.deepcopy(form_class.base_fields)
+    for field in form_class.base_fields.values():
+        field.widget.attrs.setdefault('class', 'form-control')
+    return form_class
+
+
+def mark_required(only=False):
+    """Mark ``REQUIRED_FIELDS`` required once, at class creation; ``only`` makes the rest optional."""
+    # Apply above form_control so the private copy of base_fields is changed
+    def decorate(form_class):
+        for field_name, field in form_class.base_fields.items():
+            if field_name in form_class.REQUIRED_FIELDS:
+                field.required = True
+                field.widget.attrs['required'] = 'required'
+            elif only:
+                field.required = False
+        return form_class
+    return decorate
 
 
+@form_control
 class CitizenRegistrationForm(UserCreationForm):
-    phone_number = forms.CharField(max_length=15, widget=forms.TextInput(
-        attrs={'class': 'form-control', 'placeholder': 'Phone Number'}))
+    phone_number = forms.CharField(max_length=PHONE_INPUT_MAX_LENGTH, widget=forms.TextInput(
+        attrs={'placeholder': 'Phone Number'}))
 
     class Meta:
         model = User
         fields = ('username', 'email', 'phone_number',
                   'password1', 'password2')
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field in self.fields.values():
-            field.widget.attrs['class'] = 'form-control'
+    def clean_phone_number(self):
+        return clean_phone(self.cleaned_data.get('phone_number', ''))
 
 
+@mark_required(only=True)
+@form_control
 class CitizenProfileForm(forms.ModelForm):
-    phone_number = forms.CharField(max_length=15, required=True)
+    phone_number = forms.CharField(max_length=PHONE_INPUT_MAX_LENGTH, required=True)
     emergency_contact_name = forms.CharField(max_length=100, required=True)
-    emergency_contact_phone = forms.CharField(max_length=15, required=True)
+    emergency_contact_phone = forms.CharField(max_length=PHONE_INPUT_MAX_LENGTH, required=True)
     emergency_contact_relationship = forms.CharField(max_length=50, required=True)
     house_road_no = forms.CharField(max_length=200, required=True)
     area_sector = forms.CharField(max_length=100, required=True)
@@ -30,13 +89,17 @@ class CitizenProfileForm(forms.ModelForm):
     postal_code = forms.CharField(max_length=10, required=True)
     landmarks = forms.CharField(required=False)
     last_blood_donation = forms.DateField(required=False)
+    blood_group = forms.ChoiceField(
+        choices=(('', 'Select Blood Group'),) + BLOOD_GROUPS,
+        widget=forms.Select(attrs={'id': 'blood_group'})
+    )
     available_to_donate = forms.ChoiceField(
         choices=[('', 'Select Option'), ('yes', 'Yes'), ('no', 'No')], 
         required=False
     )
     class Meta:
         model = CitizenProfile
-        fields = [
+        fields = (
             'date_of_birth',
             'blood_group',
             'phone_number',
@@ -52,93 +115,42 @@ class CitizenProfileForm(forms.ModelForm):
             'available_to_donate',
             'medical_conditions',
             'allergies',
-            
-            
-            'regular_medications'
-        ]
+            'regular_medications',
+        )
         widgets = {
             'date_of_birth': forms.DateInput(attrs={
-                'class': 'form-control',
                 'type': 'date',
                 'id': 'date_of_birth'
             }),
-            'blood_group': forms.Select(attrs={
-                'class': 'form-control',
-                'id': 'blood_group'
-            }),
-            'emergency_contact': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': '+880 xxx xxx xxxx'
-            }),
-            'present_address_details': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3,
-                'placeholder': 'House number, road, area details'
-            }),
-            'permanent_address_details': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3,
-                'placeholder': 'House number, road, area details'
-            }),
-            'frequent_address_details': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3,
-                'placeholder': 'House number, road, area details'
-            }),
             'medical_conditions': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 2,
                 'placeholder': 'e.g., Diabetes, Heart condition'
             }),
             'allergies': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 2,
                 'placeholder': 'e.g., Penicillin, Peanuts'
             }),
             'regular_medications': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 2,
                 'placeholder': 'e.g., Insulin, Blood pressure medication'
             }),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Add form-control class to all fields
-        for field_name, field in self.fields.items():
-            if field_name not in self.Meta.widgets:
-                field.widget.attrs['class'] = 'form-control'
-
-            # Make certain fields required
-            if field_name in ['date_of_birth', 'blood_group', 'emergency_contact',
-                              'present_division', 'present_district']:
-                field.required = True
-                field.widget.attrs['required'] = 'required'
-            else:
-                field.required = False
+    REQUIRED_FIELDS = frozenset({'date_of_birth', 'blood_group'})
 
+    def clean_phone_number(self):
+        return clean_phone(self.cleaned_data.get('phone_number', ''))
 
-class ServiceProviderRegistrationForm(UserCreationForm):
-    phone_number = forms.CharField(max_length=15, widget=forms.TextInput(
-        attrs={'class': 'form-control', 'placeholder': 'Phone Number'}))
-
-    class Meta:
-        model = User
-        fields = ('username', 'email', 'phone_number',
-                  'password1', 'password2')
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field in self.fields.values():
-            field.widget.attrs['class'] = 'form-control'
+    def clean_emergency_contact_phone(self):
+        return clean_phone(self.cleaned_data.get('emergency_contact_phone', ''))
 
 
+@form_control
 class ServiceProviderRegistrationForm(UserCreationForm):
     # Organization details
     organization_name = forms.CharField(
         max_length=200,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
             'placeholder': 'Enter organization name'
         }),
         help_text='This will be used as your username'
@@ -146,7 +158,10 @@ class ServiceProviderRegistrationForm(UserCreationForm):
     
     service_type = forms.ChoiceField(
         choices=ServiceProviderProfile.SERVICE_TYPE_CHOICES,
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=forms.Select(attrs={
+            # Conditional display of service_type_other
+            'onchange': 'toggleOtherField(this.value)'
+        }),
         help_text='Select your service type'
     )
     
@@ -154,7 +169,6 @@ class ServiceProviderRegistrationForm(UserCreationForm):
         max_length=100,
         required=False,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
             'placeholder': 'Please specify',
             'style': 'display: none;'  # Hidden by default
         }),
@@ -163,20 +177,14 @@ class ServiceProviderRegistrationForm(UserCreationForm):
     
     email = forms.EmailField(
         widget=forms.EmailInput(attrs={
-            'class': 'form-control',
             'placeholder': 'organization@example.com'
         }),
         help_text='Official organization email'
     )
     
     contact_number = forms.CharField(
-        max_length=15,
-        validators=[RegexValidator(
-            regex=r'^\+?1?\d{9,15}$',
-            message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
-        )],
+        max_length=PHONE_INPUT_MAX_LENGTH,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
             'placeholder': '+880 xxx xxx xxxx'
         })
     )
@@ -191,20 +199,18 @@ class ServiceProviderRegistrationForm(UserCreationForm):
         # Remove username field since we'll use organization_name
         if 'username' in self.fields:
             del self.fields['username']
-        
-        # Style password fields
-        self.fields['password1'].widget.attrs.update({'class': 'form-control'})
-        self.fields['password2'].widget.attrs.update({'class': 'form-control'})
-        
-        # Add JavaScript for conditional field display
-        self.fields['service_type'].widget.attrs.update({
-            'onchange': 'toggleOtherField(this.value)'
-        })
+
+    def clean_contact_number(self):
+        # Validate the canonical number, not the raw input with separators
+        value = normalize_phone(self.cleaned_data['contact_number'])
+        contact_number_validator(value)
+        return value
 
     def clean_organization_name(self):
         organization_name = self.cleaned_data['organization_name']
         # Check if organization name already exists as username
-        if User.objects.filter(username=organization_name.lower().replace(' ', '_')).exists():
+        self._username = ServiceProviderProfile.username_for(organization_name)
+        if User.objects.filter(username=self._username).exists():
             raise forms.ValidationError(
                 "An organization with this name already exists. Please choose a different name."
             )
@@ -223,36 +229,83 @@ class ServiceProviderRegistrationForm(UserCreationForm):
         return cleaned_data
 
     def save(self, commit=True):
-        # Create username from organization name
-        organization_name = self.cleaned_data['organization_name']
-        username = organization_name.lower().replace(' ', '_').replace('-', '_')
-        
         user = super().save(commit=False)
-        user.username = username
+        user.username = self._username
         user.email = self.cleaned_data['email']
         user.user_type = 'service_provider'
         user.phone_number = self.cleaned_data['contact_number']
         
         if commit:
-            user.save()
-            
-            # Create ServiceProviderProfile
-            ServiceProviderProfile.objects.create(
-                user=user,
-                organization_name=self.cleaned_data['organization_name'],
-                service_type=self.cleaned_data['service_type'],
-                service_type_other=self.cleaned_data.get('service_type_other', ''),
-                email=self.cleaned_data['email'],
-                contact_number=self.cleaned_data['contact_number']
-            )
+            # User and profile are written together or not at all
+            with transaction.atomic():
+                user.save()
+                self._build_profile(user).save()
         
         return user
 
+    @staticmethod
+    def _check_batch_unique(forms_):
+        """Reject usernames or phone numbers repeated in the batch or already taken."""
+        # Each form only checked itself against the database, so clashes
+        # inside the batch would otherwise surface as an IntegrityError.
+        usernames = Counter(form._username for form in forms_)
+        phones = Counter(form.cleaned_data['contact_number'] for form in forms_)
+        errors = []
+        repeated = sorted(name for name, count in usernames.items() if count > 1)
+        if repeated:
+            errors.append(forms.ValidationError(
+                "Organization names repeated in this batch: %s" % ', '.join(repeated)))
+        taken = {phone for phone, count in phones.items() if count > 1}
+        taken.update(User.objects.filter(phone_number__in=phones).values_list(
+            'phone_number', flat=True))
+        if taken:
+            errors.append(forms.ValidationError(
+                "Contact numbers repeated or already registered: %s" % ', '.join(sorted(taken))))
+        if errors:
+            raise forms.ValidationError(errors)
 
+    def _build_profile(self, user):
+        return ServiceProviderProfile(
+            user=user,
+            organization_name=self.cleaned_data['organization_name'],
+            service_type=self.cleaned_data['service_type'],
+            service_type_other=self.cleaned_data.get('service_type_other', ''),
+            email=self.cleaned_data['email'],
+            contact_number=self.cleaned_data['contact_number']
+        )
+
+    @classmethod
+    def bulk_register(cls, records):
+        """Validate and create many provider accounts with one INSERT per table."""
+        forms_ = [cls(data=record) for record in records]
+        for form in forms_:
+            if not form.is_valid():
+                raise forms.ValidationError(form.errors)
+        cls._check_batch_unique(forms_)
+
+        # Password hashing still runs once per account inside save()
+        users = [form.save(commit=False) for form in forms_]
+        profiles = [form._build_profile(user) for form, user in zip(forms_, users)]
+        # bulk_create skips the models' save(), so do its work here
+        for user in users:
+            user.normalize_phone_fields()
+        for profile in profiles:
+            profile.normalize_phone_fields()
+            profile.profile_complete = profile.is_profile_complete()
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            ServiceProviderProfile.objects.bulk_create(profiles)
+        # bulk_create sends no post_save, so expire cached counts here
+        invalidate_cached_counts(ServiceProviderProfile)
+        return users
+
+
+@mark_required()
+@form_control
 class ServiceProviderProfileForm(forms.ModelForm):
     class Meta:
         model = ServiceProviderProfile
-        fields = [
+        fields = (
             'organization_name', 'service_type', 'service_type_other',
             'email', 'contact_number', 'registration_number',
             'street_address', 'area_sector', 'city', 'postal_code',
@@ -261,111 +314,79 @@ class ServiceProviderProfileForm(forms.ModelForm):
             'primary_contact_person', 'contact_person_designation',
             'emergency_hotline', 'emergency_email', 'current_capacity',
             'operating_hours'
-        ]
+        )
         
         widgets = {
             'organization_name': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Organization Name'
             }),
-            'service_type': forms.Select(attrs={
-                'class': 'form-control'
-            }),
             'service_type_other': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Please specify'
             }),
             'email': forms.EmailInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'organization@example.com'
             }),
             'contact_number': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': '+880 xxx xxx xxxx'
             }),
             'registration_number': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Official registration number'
             }),
             'street_address': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Street address'
             }),
             'area_sector': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Area/Sector'
             }),
             'city': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'City'
             }),
             'postal_code': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Postal Code'
             }),
             'specialized_services': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 3,
                 'placeholder': 'List specialized services offered'
             }),
             'equipment_available': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 3,
                 'placeholder': 'List major equipment and resources'
             }),
             'staff_count': forms.NumberInput(attrs={
-                'class': 'form-control',
                 'min': '1'
             }),
             'maximum_capacity': forms.NumberInput(attrs={
-                'class': 'form-control',
                 'min': '1'
             }),
             'average_response_time': forms.NumberInput(attrs={
-                'class': 'form-control',
                 'min': '1',
                 'placeholder': 'Minutes'
             }),
             'primary_contact_person': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Contact person name'
             }),
             'contact_person_designation': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Designation/Title'
             }),
             'emergency_hotline': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'Emergency contact number'
             }),
             'emergency_email': forms.EmailInput(attrs={
-                'class': 'form-control',
                 'placeholder': 'emergency@organization.com'
             }),
             'current_capacity': forms.NumberInput(attrs={
-                'class': 'form-control',
                 'min': '0'
             }),
             'operating_hours': forms.TextInput(attrs={
-                'class': 'form-control',
                 'placeholder': '24/7 or specify hours'
             }),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # Make certain fields required
-        required_fields = [
-            'organization_name', 'service_type', 'email', 'contact_number',
-            'street_address', 'area_sector', 'city', 'postal_code',
-            'primary_contact_person', 'emergency_hotline'
-        ]
-        
-        for field_name in required_fields:
-            if field_name in self.fields:
-                self.fields[field_name].required = True
-                self.fields[field_name].widget.attrs['required'] = 'required'
+    REQUIRED_FIELDS = frozenset({
+        'organization_name', 'service_type', 'email', 'contact_number',
+        'street_address', 'area_sector', 'city', 'postal_code',
+        'primary_contact_person', 'emergency_hotline',
+    })
 
     def clean(self):
         cleaned_data = super().clean()
@@ -390,41 +411,28 @@ class ServiceProviderProfileForm(forms.ModelForm):
         return cleaned_data
 
 
+@form_control
 class QuickUpdateForm(forms.ModelForm):
     """Form for quick updates of frequently changed information"""
     class Meta:
         model = ServiceProviderProfile
-        fields = ['current_capacity', 'contact_number', 'current_status', 'operating_hours']
+        fields = ServiceProviderProfile.QUICK_UPDATE_FIELDS
         
         widgets = {
             'current_capacity': forms.NumberInput(attrs={
-                'class': 'form-control',
                 'min': '0'
             }),
-            'contact_number': forms.TextInput(attrs={
-                'class': 'form-control'
-            }),
-            'current_status': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'operating_hours': forms.TextInput(attrs={
-                'class': 'form-control'
-            }),
         }
 
 
+@form_control
 class ServiceProviderRatingForm(forms.ModelForm):
     class Meta:
         model = ServiceProviderRating
-        fields = ['rating', 'review']
+        fields = ('rating', 'review')
         
         widgets = {
-            'rating': forms.Select(
-                choices=[(i, f'{i} Star{"s" if i != 1 else ""}') for i in range(1, 6)],
-                attrs={'class': 'form-control'}
-            ),
             'review': forms.Textarea(attrs={
-                'class': 'form-control',
                 'rows': 4,
                 'placeholder': 'Share your experience (optional)'
             }),
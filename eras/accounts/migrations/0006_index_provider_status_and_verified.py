@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-15 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_bloodrequest_bags_needed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='serviceproviderprofile',
+            name='current_status',
+            field=models.CharField(choices=[('active', 'Active'), ('inactive', 'Inactive'), ('maintenance', 'Under Maintenance')], db_index=True, default='active', max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='serviceproviderprofile',
+            name='is_verified',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
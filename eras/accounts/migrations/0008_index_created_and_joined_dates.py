@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-15 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_provider_search_trigram_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyresponse',
+            index=models.Index(fields=['-created_at'], name='accounts_em_created_792656_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceproviderprofile',
+            index=models.Index(fields=['-created_at'], name='accounts_se_created_7a856b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceproviderrating',
+            index=models.Index(fields=['-created_at'], name='accounts_se_created_918b5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined'], name='accounts_us_date_jo_bab293_idx'),
+        ),
+    ]
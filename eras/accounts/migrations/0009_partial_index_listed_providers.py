@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_index_created_and_joined_dates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviceproviderprofile',
+            index=models.Index(condition=models.Q(('current_status', 'active'), ('is_verified', True)), fields=['service_type'], name='spp_listed_service_type_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_partial_index_listed_providers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='serviceproviderrating',
+            name='rating',
+            field=models.PositiveIntegerField(choices=[(1, '1 Star'), (2, '2 Stars'), (3, '3 Stars'), (4, '4 Stars'), (5, '5 Stars')]),
+        ),
+    ]
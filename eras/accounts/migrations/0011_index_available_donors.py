@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_rating_choice_labels'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizenprofile',
+            index=models.Index(condition=models.Q(('available_to_donate', 'yes')), fields=['blood_group'], name='citizen_donor_blood_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='citizenprofile',
+            index=models.Index(condition=models.Q(('available_to_donate', 'yes')), fields=['-last_blood_donation', '-id'], name='citizen_donor_recent_idx'),
+        ),
+    ]
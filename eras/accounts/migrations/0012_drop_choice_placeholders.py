@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_index_available_donors'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='citizenprofile',
+            name='available_to_donate',
+            field=models.CharField(blank=True, choices=[('yes', 'Yes'), ('no', 'No')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='citizenprofile',
+            name='blood_group',
+            field=models.CharField(blank=True, choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('AB+', 'AB+'), ('AB-', 'AB-'), ('O+', 'O+'), ('O-', 'O-')], max_length=5),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-15 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_drop_choice_placeholders'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bloodrequest',
+            name='accounts_bl_blood_t_02cc94_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bloodrequest',
+            name='accounts_bl_request_6144f2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bloodrequest',
+            name='accounts_bl_status_80dff4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bloodrequest',
+            name='accounts_bl_urgency_de5c3a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['status', '-urgency', '-created_at'], name='br_status_urgency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['blood_type_needed', 'status', '-needed_by_date'], name='br_blood_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['requester_city', 'status', '-needed_by_date'], name='br_city_status_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-15 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_blood_request_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bloodrequest',
+            name='br_status_urgency_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['-urgency', '-created_at'], name='br_open_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_partial_open_blood_request_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizenprofile',
+            index=models.Index(condition=models.Q(('available_to_donate', 'yes'), ('emergency_donor', True)), fields=['blood_group'], name='citizen_emergency_donor_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-15 23:10
+
+from django.db import migrations, models
+
+# Snapshot of each model's COMPLETENESS_FIELDS when the column was added;
+# historical models don't carry class attributes.
+COMPLETENESS_FIELDS = {
+    'CitizenProfile': (
+        'date_of_birth', 'blood_group', 'phone_number',
+        'emergency_contact_name', 'emergency_contact_phone',
+        'house_road_no', 'area_sector', 'city', 'postal_code',
+    ),
+    'ServiceProviderProfile': (
+        'organization_name', 'service_type', 'email', 'contact_number',
+        'street_address', 'area_sector', 'city', 'postal_code',
+        'primary_contact_person', 'emergency_hotline',
+    ),
+}
+
+
+def backfill_profile_complete(apps, schema_editor):
+    for model_name, fields in COMPLETENESS_FIELDS.items():
+        model = apps.get_model('accounts', model_name)
+        incomplete = models.Q()
+        for name in fields:
+            if model._meta.get_field(name).null:
+                incomplete |= models.Q(**{f'{name}__isnull': True})
+            else:
+                incomplete |= models.Q(**{name: ''})
+        model.objects.exclude(incomplete).update(profile_complete=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_index_user_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='citizenprofile',
+            name='profile_complete',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceproviderprofile',
+            name='profile_complete',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_profile_complete, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-15 23:12
+
+from django.db import migrations, models
+
+
+def backfill_ratings(apps, schema_editor):
+    ServiceProviderProfile = apps.get_model('accounts', 'ServiceProviderProfile')
+    ServiceProviderRating = apps.get_model('accounts', 'ServiceProviderRating')
+    stats = ServiceProviderRating.objects.values('service_provider').annotate(
+        avg=models.Avg('rating'), count=models.Count('id'))
+    for row in stats:
+        ServiceProviderProfile.objects.filter(pk=row['service_provider']).update(
+            avg_rating=row['avg'], rating_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_store_profile_complete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceproviderprofile',
+            name='avg_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceproviderprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_cache_provider_ratings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='br_creator_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_index_requests_by_creator'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyresponse',
+            index=models.Index(fields=['service_provider', '-created_at'], name='er_provider_recent_idx'),
+        ),
+    ]
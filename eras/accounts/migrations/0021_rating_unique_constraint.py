@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-15 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_index_provider_responses'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='serviceproviderrating',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='serviceproviderrating',
+            index=models.Index(fields=['service_provider', '-created_at'], name='spr_sp_recent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='serviceproviderrating',
+            constraint=models.UniqueConstraint(fields=('service_provider', 'user'), name='spr_sp_user_uniq'),
+        ),
+    ]
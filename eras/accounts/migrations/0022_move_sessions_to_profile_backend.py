@@ -0,0 +1,41 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import migrations
+from django.utils import timezone
+
+OLD_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+NEW_BACKEND = 'accounts.backends.ProfileModelBackend'
+
+
+def _swap_backend(apps, old, new):
+    # Session data is signed, so the backend path can't be matched in SQL;
+    # decode each live session and re-encode the ones that need moving.
+    Session = apps.get_model('sessions', 'Session')
+    store = SessionStore()
+    live = Session.objects.filter(expire_date__gt=timezone.now())
+    for session in live.iterator():
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) == old:
+            data[BACKEND_SESSION_KEY] = new
+            session.session_data = store.encode(data)
+            session.save(update_fields=['session_data'])
+
+
+def move_sessions_to_profile_backend(apps, schema_editor):
+    _swap_backend(apps, OLD_BACKEND, NEW_BACKEND)
+
+
+def move_sessions_to_model_backend(apps, schema_editor):
+    _swap_backend(apps, NEW_BACKEND, OLD_BACKEND)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0021_rating_unique_constraint'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_sessions_to_profile_backend, move_sessions_to_model_backend),
+    ]
@@ -0,0 +1,69 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+# Snapshot of models.PHONE_SEPARATORS_RE and each model's PHONE_FIELDS when
+# normalization on save was introduced.
+PHONE_SEPARATORS_RE = re.compile(r'[\s\-().]')
+PHONE_FIELDS = {
+    'CitizenProfile': ('phone_number', 'emergency_contact_phone'),
+    'ServiceProviderProfile': ('contact_number', 'emergency_hotline'),
+    'BloodRequest': ('contact_phone',),
+}
+
+
+def normalize_phone(value):
+    return PHONE_SEPARATORS_RE.sub('', value or '')
+
+
+def _normalize_rows(model, fields):
+    changed = []
+    for pk, *values in model.objects.values_list('pk', *fields).iterator():
+        canonical = [normalize_phone(value) for value in values]
+        if canonical != values:
+            changed.append(model(pk=pk, **dict(zip(fields, canonical))))
+    model.objects.bulk_update(changed, fields, batch_size=500)
+
+
+def normalize_user_phones(User):
+    """Normalize User.phone_number, leaving numbers that would collide as they are."""
+    owners = defaultdict(list)
+    for pk, phone in User.objects.order_by('pk').values_list('pk', 'phone_number').iterator():
+        owners[normalize_phone(phone)].append((pk, phone))
+
+    changed, collisions = [], {}
+    for canonical, rows in owners.items():
+        if len(rows) > 1:
+            collisions[canonical] = rows
+            continue
+        pk, phone = rows[0]
+        if phone != canonical:
+            changed.append(User(pk=pk, phone_number=canonical))
+    User.objects.bulk_update(changed, ['phone_number'], batch_size=500)
+
+    if collisions:
+        # Two accounts can't share the unique number; these need merging or
+        # correcting by hand before they can be saved.
+        print('\n  Phone numbers left unnormalized because they collide:')
+        for canonical, rows in sorted(collisions.items()):
+            users = ', '.join(f'user {pk} ({phone!r})' for pk, phone in rows)
+            print(f'    {canonical}: {users}')
+    return collisions
+
+
+def normalize_stored_phones(apps, schema_editor):
+    normalize_user_phones(apps.get_model('accounts', 'User'))
+    for model_name, fields in PHONE_FIELDS.items():
+        _normalize_rows(apps.get_model('accounts', model_name), fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0022_move_sessions_to_profile_backend'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_stored_phones, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,48 @@
+import re
+
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.utils import timezone
+
+BLOOD_GROUPS = (
+    ('A+', 'A+'),
+    ('A-', 'A-'),
+    ('B+', 'B+'),
+    ('B-', 'B-'),
+    ('AB+', 'AB+'),
+    ('AB-', 'AB-'),
+    ('O+', 'O+'),
+    ('O-', 'O-'),
+)
+
+RATING_CHOICES = tuple((i, f'{i} Star{"s" if i != 1 else ""}') for i in range(1, 6))
+
+PHONE_SEPARATORS_RE = re.compile(r'[\s\-().]')
+
+
+def normalize_phone(value):
+    """Drop spaces and punctuation so equal numbers compare equal in SQL."""
+    return PHONE_SEPARATORS_RE.sub('', value or '')
+
+
+class _PhoneFieldsMixin:
+    """Stores ``PHONE_FIELDS`` in canonical form on every save."""
+
+    def normalize_phone_fields(self):
+        """Put every loaded ``PHONE_FIELDS`` value in canonical form."""
+        # Called directly before bulk_create(), which skips save()
+        deferred = self.get_deferred_fields()
+        for name in self.PHONE_FIELDS:
+            if name not in deferred:
+                setattr(self, name, normalize_phone(getattr(self, name)))
 
+    def save(self, *args, **kwargs):
+        self.normalize_phone_fields()
+        super().save(*args, **kwargs)
 
-class User(AbstractUser):
+
+class User(_PhoneFieldsMixin, AbstractUser):
     USER_TYPES = (
         ('citizen', 'Citizen'),
         ('service_provider', 'Service Provider'),
@@ -12,26 +52,79 @@ class User(AbstractUser):
         max_length=20, choices=USER_TYPES, default='citizen')
     phone_number = models.CharField(max_length=15, unique=True)
 
+    PHONE_FIELDS = ('phone_number',)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-date_joined']),
+            # Admin user_type filter, listed newest first
+            models.Index(fields=['user_type', '-date_joined'], name='user_type_joined_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
 
-class CitizenProfile(models.Model):
-    BLOOD_GROUP_CHOICES = [
-        ('', 'Select Blood Group'),
-        ('A+', 'A+'),
-        ('A-', 'A-'),
-        ('B+', 'B+'),
-        ('B-', 'B-'),
-        ('AB+', 'AB+'),
-        ('AB-', 'AB-'),
-        ('O+', 'O+'),
-        ('O-', 'O-'),
-    ]
+class _ProfileManager(models.Manager):
+    """Profiles are almost always shown with their user, so join it by default."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
+
+class _ProviderLinkManager(models.Manager):
+    """Rows whose ``__str__`` names their provider, so join it by default."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('service_provider')
+
+
+class _ProfileCompletenessMixin:
+    """Keeps the stored ``profile_complete`` flag in step with ``COMPLETENESS_FIELDS``."""
+
+    def is_profile_complete(self):
+        return all(getattr(self, name) for name in self.COMPLETENESS_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # Saves of partially loaded rows (only()/defer()) leave the flag
+        # alone rather than fetching every deferred completeness field.
+        if not self.get_deferred_fields().intersection(self.COMPLETENESS_FIELDS):
+            self.profile_complete = self.is_profile_complete()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'profile_complete'}
+        super().save(*args, **kwargs)
+
+
+class CitizenProfileQuerySet(models.QuerySet):
+    def complete(self):
+        return self.filter(profile_complete=True)
+
+    def for_listing(self):
+        """Skip the free-text medical columns that donor lists never render."""
+        return self.defer('medical_conditions', 'allergies', 'regular_medications')
+
+
+class CitizenProfile(_PhoneFieldsMixin, _ProfileCompletenessMixin, models.Model):
+    BLOOD_GROUP_CHOICES = BLOOD_GROUPS
+
+    COMPLETENESS_FIELDS = (
+        'date_of_birth', 'blood_group', 'phone_number',
+        'emergency_contact_name', 'emergency_contact_phone',
+        'house_road_no', 'area_sector', 'city', 'postal_code',
+    )
+    PHONE_FIELDS = ('phone_number', 'emergency_contact_phone')
+
+    DONOR_CITIES_CACHE_KEY = 'accounts.citizenprofile:donor_cities'
+    # Signal invalidation only reaches this process's cache, so the TTL is
+    # what bounds staleness in the other workers
+    CITIES_TIMEOUT = 60
 
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, related_name='citizen_profile')
 
+    objects = _ProfileManager.from_queryset(CitizenProfileQuerySet)()
+
     # Personal Information
     date_of_birth = models.DateField(null=True, blank=True)
     blood_group = models.CharField(
@@ -53,7 +146,7 @@ class CitizenProfile(models.Model):
     last_blood_donation = models.DateField(null=True, blank=True)
     available_to_donate = models.CharField(
         max_length=10,
-        choices=[('', 'Select Option'), ('yes', 'Yes'), ('no', 'No')],
+        choices=[('yes', 'Yes'), ('no', 'No')],
         blank=True
     )
 
@@ -66,30 +159,38 @@ class CitizenProfile(models.Model):
     allergies = models.TextField(blank=True)
     regular_medications = models.TextField(blank=True)
 
+    # Maintained by save() from COMPLETENESS_FIELDS
+    profile_complete = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        # Donor lookups only ever look at citizens available to donate.
+        indexes = [
+            models.Index(fields=['blood_group'],
+                         condition=models.Q(available_to_donate='yes'),
+                         name='citizen_donor_blood_group_idx'),
+            models.Index(fields=['-last_blood_donation', '-id'],
+                         condition=models.Q(available_to_donate='yes'),
+                         name='citizen_donor_recent_idx'),
+            models.Index(fields=['blood_group'],
+                         condition=models.Q(available_to_donate='yes', emergency_donor=True),
+                         name='citizen_emergency_donor_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
-    def is_profile_complete(self):
-        required_fields = [
-            self.date_of_birth, self.blood_group, self.phone_number,
-            self.emergency_contact_name, self.emergency_contact_phone,
-            self.house_road_no, self.area_sector, self.city, self.postal_code
-        ]
-        return all(required_fields)
+    @classmethod
+    def donor_cities(cls):
+        """Sorted cities that have available donors, read through the cache."""
+        def load():
+            return sorted(set(cls.objects.filter(available_to_donate='yes').exclude(
+                city__in=['', None]).values_list('city', flat=True)))
+        return cache.get_or_set(cls.DONOR_CITIES_CACHE_KEY, load, cls.CITIES_TIMEOUT)
 
 
 # NEW: Blood Request Model for Sprint 1
-class BloodRequest(models.Model):
-    BLOOD_TYPE_CHOICES = [
-        ('A+', 'A+'),
-        ('A-', 'A-'),
-        ('B+', 'B+'),
-        ('B-', 'B-'),
-        ('AB+', 'AB+'),
-        ('AB-', 'AB-'),
-        ('O+', 'O+'),
-        ('O-', 'O-'),
-    ]
+class BloodRequest(_PhoneFieldsMixin, models.Model):
+    BLOOD_TYPE_CHOICES = BLOOD_GROUPS
 
     URGENCY_CHOICES = [
         ('urgent', 'Urgent'),
@@ -101,6 +202,13 @@ class BloodRequest(models.Model):
         ('fulfilled', 'Fulfilled'),
     ]
 
+    PHONE_FIELDS = ('contact_phone',)
+
+    # Public open-request feed, shared by every visitor for a few seconds
+    OPEN_FEED_CACHE_KEY = 'accounts.bloodrequest:open_feed'
+    OPEN_FEED_SIZE = 10
+    OPEN_FEED_TIMEOUT = 30
+
     # Public fields (always required)
     requester_name = models.CharField(
         max_length=100, help_text="Person making the request")
@@ -138,11 +246,19 @@ class BloodRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Leading columns also serve filters on just their prefix
         indexes = [
-            models.Index(fields=['blood_type_needed']),
-            models.Index(fields=['requester_city']),
-            models.Index(fields=['status']),
-            models.Index(fields=['urgency']),
+            # Open-request feeds; fulfilled rows never enter this index
+            models.Index(fields=['-urgency', '-created_at'],
+                         condition=models.Q(status='open'),
+                         name='br_open_feed_idx'),
+            models.Index(fields=['blood_type_needed', 'status', '-needed_by_date'],
+                         name='br_blood_type_status_idx'),
+            models.Index(fields=['requester_city', 'status', '-needed_by_date'],
+                         name='br_city_status_idx'),
+            # A citizen's own requests, newest first, without a sort step
+            models.Index(fields=['created_by', '-created_at'],
+                         name='br_creator_recent_idx'),
         ]
 
     def __str__(self):
@@ -151,8 +267,18 @@ class BloodRequest(models.Model):
     def is_urgent(self):
         return self.urgency == 'urgent'
 
+    @classmethod
+    def open_feed(cls, limit=OPEN_FEED_SIZE):
+        """Newest open requests, urgent first, read through the cache."""
+        feed = cache.get(cls.OPEN_FEED_CACHE_KEY)
+        if feed is None:
+            feed = list(cls.objects.filter(status='open').order_by(
+                '-urgency', '-created_at')[:cls.OPEN_FEED_SIZE])
+            cache.set(cls.OPEN_FEED_CACHE_KEY, feed, cls.OPEN_FEED_TIMEOUT)
+        return feed[:limit]
 
-class ServiceProviderProfile(models.Model):
+
+class ServiceProviderProfile(_PhoneFieldsMixin, _ProfileCompletenessMixin, models.Model):
     SERVICE_TYPE_CHOICES = [
         ('hospital', 'Hospital'),
         ('ambulance', 'Ambulance Service'),
@@ -170,9 +296,25 @@ class ServiceProviderProfile(models.Model):
         ('maintenance', 'Under Maintenance'),
     ]
 
+    COMPLETENESS_FIELDS = (
+        'organization_name', 'service_type', 'email', 'contact_number',
+        'street_address', 'area_sector', 'city', 'postal_code',
+        'primary_contact_person', 'emergency_hotline',
+    )
+    PHONE_FIELDS = ('contact_number', 'emergency_hotline')
+
+    # Frequently changed fields, edited through QuickUpdateForm
+    QUICK_UPDATE_FIELDS = ('current_capacity', 'contact_number', 'current_status', 'operating_hours')
+
+    DIRECTORY_CITIES_CACHE_KEY = 'accounts.serviceproviderprofile:directory_cities'
+    # Short for the same reason as CitizenProfile.CITIES_TIMEOUT
+    CITIES_TIMEOUT = 60
+
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, related_name='service_provider_profile')
 
+    objects = _ProfileManager()
+
     # Basic Organization Details
     organization_name = models.CharField(max_length=200)
     service_type = models.CharField(
@@ -210,7 +352,7 @@ class ServiceProviderProfile(models.Model):
 
     # Status and Operational Info
     current_status = models.CharField(
-        max_length=15, choices=STATUS_CHOICES, default='active')
+        max_length=15, choices=STATUS_CHOICES, default='active', db_index=True)
     current_capacity = models.PositiveIntegerField(null=True, blank=True,
                                                    help_text="Current available capacity")
     operating_hours = models.CharField(
@@ -220,24 +362,53 @@ class ServiceProviderProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     profile_completed_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by save() from COMPLETENESS_FIELDS
+    profile_complete = models.BooleanField(default=False, editable=False)
+    # Maintained by recompute_ratings() whenever a rating changes
+    avg_rating = models.FloatField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
 
     # Verification
-    is_verified = models.BooleanField(default=False)
+    is_verified = models.BooleanField(default=False, db_index=True)
     verified_at = models.DateTimeField(null=True, blank=True)
     verified_by = models.ForeignKey(User, on_delete=models.SET_NULL,
                                     null=True, blank=True, related_name='verified_providers')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at']),
+            # The public directory only lists verified, active providers.
+            models.Index(fields=['service_type'],
+                         condition=models.Q(is_verified=True, current_status='active'),
+                         name='spp_listed_service_type_idx'),
+        ]
+
     def __str__(self):
         return f"{self.organization_name} - {self.get_service_type_display()}"
 
-    def is_profile_complete(self):
-        required_fields = [
-            self.organization_name, self.service_type, self.email,
-            self.contact_number, self.street_address, self.area_sector,
-            self.city, self.postal_code, self.primary_contact_person,
-            self.emergency_hotline
-        ]
-        return all(field for field in required_fields)
+    @classmethod
+    def directory_cities(cls):
+        """Sorted cities of verified providers, read through the cache."""
+        def load():
+            return sorted(cls.objects.filter(is_verified=True).exclude(
+                city='').values_list('city', flat=True).distinct())
+        return cache.get_or_set(cls.DIRECTORY_CITIES_CACHE_KEY, load, cls.CITIES_TIMEOUT)
+
+    @staticmethod
+    def username_for(organization_name):
+        """Username a provider account gets for ``organization_name``."""
+        return organization_name.lower().replace(' ', '_').replace('-', '_')
+
+    def recompute_ratings(self):
+        """Refresh avg_rating and rating_count from the ratings table."""
+        stats = self.ratings.aggregate(
+            avg_rating=models.Avg('rating', default=0),
+            rating_count=models.Count('id'),
+        )
+        # update() rather than save() so updated_at and post_save are left alone
+        type(self).objects.filter(pk=self.pk).update(**stats)
+        self.avg_rating = stats['avg_rating']
+        self.rating_count = stats['rating_count']
 
     def get_capacity_percentage(self):
         if self.maximum_capacity and self.current_capacity is not None:
@@ -251,16 +422,26 @@ class ServiceProviderProfile(models.Model):
 
 
 class ServiceProviderRating(models.Model):
+    objects = _ProviderLinkManager()
+
     service_provider = models.ForeignKey(ServiceProviderProfile, on_delete=models.CASCADE,
                                          related_name='ratings')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    rating = models.PositiveIntegerField(
-        choices=[(i, i) for i in range(1, 6)])  # 1-5 stars
+    rating = models.PositiveIntegerField(choices=RATING_CHOICES)
     review = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('service_provider', 'user')
+        constraints = [
+            models.UniqueConstraint(fields=['service_provider', 'user'],
+                                    name='spr_sp_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-created_at']),
+            # A provider's reviews, newest first, on the detail page
+            models.Index(fields=['service_provider', '-created_at'],
+                         name='spr_sp_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.rating} stars for {self.service_provider.organization_name}"
@@ -275,6 +456,8 @@ class EmergencyResponse(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    objects = _ProviderLinkManager()
+
     service_provider = models.ForeignKey(ServiceProviderProfile, on_delete=models.CASCADE,
                                          related_name='emergency_responses')
     incident_id = models.CharField(max_length=50, unique=True)
@@ -284,5 +467,22 @@ class EmergencyResponse(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at']),
+            # A provider's latest responses on the dashboard
+            models.Index(fields=['service_provider', '-created_at'],
+                         name='er_provider_recent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.incident_id} - {self.service_provider.organization_name}"
+
+    def set_status(self, status):
+        """Move to ``status``, writing only the status columns."""
+        changes = {'status': status}
+        if status == 'completed':
+            changes['completed_at'] = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(**changes)
+        for name, value in changes.items():
+            setattr(self, name, value)
@@ -0,0 +1,38 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+def _count_version_key(model):
+    return f'{model._meta.label_lower}:count:version'
+
+
+def invalidate_cached_counts(model):
+    """Expire every cached count for ``model`` by bumping its version"""
+    key = _count_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches the queryset's COUNT(*) keyed on its SQL"""
+    count_timeout = 60
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            sql = str(queryset.query)
+        except (AttributeError, EmptyResultSet):
+            return super().count
+
+        model = queryset.model
+        version = cache.get_or_set(_count_version_key(model), 1, None)
+        digest = hashlib.md5(sql.encode()).hexdigest()
+        key = f'{model._meta.label_lower}:count:{version}:{digest}'
+        return cache.get_or_set(key, queryset.count, self.count_timeout)
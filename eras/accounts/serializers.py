@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from .models import CitizenProfile, ServiceProviderProfile, BloodRequest
 
 User = get_user_model()
@@ -59,7 +60,7 @@ class RegistrationSerializer(serializers.Serializer):
                 raise serializers.ValidationError("Organization name, service type, and contact number are required.")
             
             # Username is derived from organization_name
-            username = data['organization_name'].lower().replace(' ', '_').replace('-', '_')
+            username = ServiceProviderProfile.username_for(data['organization_name'])
             if User.objects.filter(username=username).exists():
                 raise serializers.ValidationError("An organization with this name already exists.")
             
@@ -76,12 +77,13 @@ class RegistrationSerializer(serializers.Serializer):
                 user_type='citizen'
             )
             user.set_password(validated_data['password'])
-            user.save()
-            CitizenProfile.objects.create(user=user)
+            with transaction.atomic():
+                user.save()
+                CitizenProfile.objects.create(user=user)
             return user
             
         elif user_type == 'service_provider':
-            username = validated_data['organization_name'].lower().replace(' ', '_').replace('-', '_')
+            username = ServiceProviderProfile.username_for(validated_data['organization_name'])
             user = User(
                 username=username,
                 email=validated_data['email'],
@@ -89,12 +91,13 @@ class RegistrationSerializer(serializers.Serializer):
                 user_type='service_provider'
             )
             user.set_password(validated_data['password'])
-            user.save()
-            ServiceProviderProfile.objects.create(
-                user=user,
-                organization_name=validated_data['organization_name'],
-                service_type=validated_data['service_type'],
-                email=validated_data['email'],
-                contact_number=validated_data['contact_number']
-            )
+            with transaction.atomic():
+                user.save()
+                ServiceProviderProfile.objects.create(
+                    user=user,
+                    organization_name=validated_data['organization_name'],
+                    service_type=validated_data['service_type'],
+                    email=validated_data['email'],
+                    contact_number=validated_data['contact_number']
+                )
             return user
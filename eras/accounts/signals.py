@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import BloodRequest, CitizenProfile, ServiceProviderProfile, ServiceProviderRating
+from .pagination import invalidate_cached_counts
+
+
+@receiver([post_save, post_delete], sender=ServiceProviderProfile)
+def expire_provider_counts(sender, **kwargs):
+    invalidate_cached_counts(sender)
+
+
+@receiver([post_save, post_delete], sender=ServiceProviderProfile)
+def expire_directory_cities(sender, **kwargs):
+    cache.delete(sender.DIRECTORY_CITIES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=CitizenProfile)
+def expire_donor_cities(sender, **kwargs):
+    cache.delete(sender.DONOR_CITIES_CACHE_KEY)
+
+
+@receiver(pre_delete, sender=ServiceProviderProfile)
+def mark_deleted_provider(sender, instance, origin=None, **kwargs):
+    # pre_delete runs for every collected row before the cascade removes the
+    # provider's ratings, so their post_delete can tell the provider is going
+    if origin is not None:
+        origin._deleted_provider_ids = {
+            *getattr(origin, '_deleted_provider_ids', ()), instance.pk}
+
+
+@receiver([post_save, post_delete], sender=ServiceProviderRating)
+def refresh_provider_ratings(sender, instance, origin=None, **kwargs):
+    if instance.service_provider_id in getattr(origin, '_deleted_provider_ids', ()):
+        return
+    # Cascaded rows come without the joined provider; recompute by pk
+    # rather than fetching it
+    if sender.service_provider.is_cached(instance):
+        provider = instance.service_provider
+    else:
+        provider = ServiceProviderProfile(pk=instance.service_provider_id)
+    provider.recompute_ratings()
+
+
+@receiver([post_save, post_delete], sender=BloodRequest)
+def expire_open_feed(sender, **kwargs):
+    cache.delete(sender.OPEN_FEED_CACHE_KEY)
@@ -1,17 +1,32 @@
-from django.test import TestCase, Client
+from django.contrib import admin
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.contrib.auth import get_user_model
+from django.apps import apps as global_apps
+from django.contrib.auth import BACKEND_SESSION_KEY, authenticate, get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
 from django.utils import timezone
+import io
+from contextlib import redirect_stdout
 from datetime import date, timedelta
+from importlib import import_module
+from unittest import mock
 from accounts.models import (
     User, CitizenProfile, ServiceProviderProfile, 
-    ServiceProviderRating, BloodRequest
+    ServiceProviderRating, BloodRequest, EmergencyResponse
 )
 from accounts.forms import (
     CitizenRegistrationForm, CitizenProfileForm,
     ServiceProviderRegistrationForm, ServiceProviderProfileForm,
     QuickUpdateForm, ServiceProviderRatingForm
 )
+from accounts.admin import ServiceProviderProfileAdmin
+from accounts.backends import ProfileModelBackend
+from accounts.pagination import CachedCountPaginator
+from disasters.models import Disaster, DisasterAlert, DisasterResponse
 
 User = get_user_model()
 
@@ -45,31 +60,75 @@ class UserModelTests(TestCase):
     
     def test_unique_phone_number(self):
         """Test phone number uniqueness constraint"""
-        User.objects.create_user(
+        # Only the constraint matters here, so skip password hashing
+        User.objects.create(username='user1', phone_number='+8801712345678')
+        with self.assertRaises(IntegrityError):
+            User.objects.create(username='user2', phone_number='+8801712345678')
+
+    def test_phone_number_normalized_on_save(self):
+        """Test separators are stripped before the phone number is stored"""
+        user = User.objects.create_user(
             username='user1',
-            phone_number='+8801712345678',
+            phone_number='+880 1712-345678',
             password='test123'
         )
-        with self.assertRaises(Exception):
-            User.objects.create_user(
-                username='user2',
-                phone_number='+8801712345678',
-                password='test123'
-            )
+        self.assertEqual(User.objects.get(pk=user.pk).phone_number, '+8801712345678')
+
+    def test_migration_normalizes_legacy_phones(self):
+        """Test stored free-form numbers are normalized, reporting collisions"""
+        migration = import_module('accounts.migrations.0023_normalize_stored_phones')
+        legacy = User.objects.create(username='legacy', phone_number='+8801712345678')
+        taken = User.objects.create(username='taken', phone_number='+8801712345679')
+        clash = User.objects.create(username='clash', phone_number='+8801712345677')
+        profile = CitizenProfile.objects.create(user=legacy)
+        # update() writes the values as the old forms stored them
+        User.objects.filter(pk=legacy.pk).update(phone_number='+880 1712-345678')
+        User.objects.filter(pk=clash.pk).update(phone_number='+880 1712 345679')
+        CitizenProfile.objects.filter(pk=profile.pk).update(
+            phone_number='+880 1712-345678', emergency_contact_phone='(017) 1234 5678')
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            migration.normalize_stored_phones(global_apps, None)
+
+        phones = dict(User.objects.values_list('username', 'phone_number'))
+        self.assertEqual(phones, {
+            'legacy': '+8801712345678',
+            'taken': '+8801712345679',
+            'clash': '+880 1712 345679',
+        })
+        profile.refresh_from_db()
+        self.assertEqual(profile.phone_number, '+8801712345678')
+        self.assertEqual(profile.emergency_contact_phone, '01712345678')
+        self.assertIn(f"+8801712345679: user {taken.pk} ('+8801712345679'), "
+                      f"user {clash.pk} ('+880 1712 345679')", output.getvalue())
 
 
 class CitizenProfileModelTests(TestCase):
     """Test CitizenProfile model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testcitizen',
             email='citizen@test.com',
             password='testpass123',
             phone_number='+8801712345678',
             user_type='citizen'
         )
-        self.profile = CitizenProfile.objects.create(user=self.user)
+        cls.profile = CitizenProfile.objects.create(user=cls.user)
+
+    def fill_profile(self):
+        """Set every field is_profile_complete() checks"""
+        self.profile.date_of_birth = date(1990, 1, 1)
+        self.profile.blood_group = 'A+'
+        self.profile.phone_number = '+8801712345678'
+        self.profile.emergency_contact_name = 'John Doe'
+        self.profile.emergency_contact_phone = '+8801712345679'
+        self.profile.house_road_no = '123 Main St'
+        self.profile.area_sector = 'Gulshan'
+        self.profile.city = 'Dhaka'
+        self.profile.postal_code = '1212'
     
     def test_profile_creation(self):
         """Test profile is created"""
@@ -82,41 +141,61 @@ class CitizenProfileModelTests(TestCase):
     
     def test_is_profile_complete_true(self):
         """Test complete profile"""
-        self.profile.date_of_birth = date(1990, 1, 1)
-        self.profile.blood_group = 'A+'
-        self.profile.phone_number = '+8801712345678'
-        self.profile.emergency_contact_name = 'John Doe'
-        self.profile.emergency_contact_phone = '+8801712345679'
-        self.profile.house_road_no = '123 Main St'
-        self.profile.area_sector = 'Gulshan'
-        self.profile.city = 'Dhaka'
-        self.profile.postal_code = '1212'
+        # is_profile_complete() reads the instance, so nothing is saved
+        self.fill_profile()
+        self.assertTrue(self.profile.is_profile_complete())
+
+    def test_complete_queryset_matches_method(self):
+        """Test the stored completeness flag agrees with is_profile_complete"""
+        self.assertFalse(CitizenProfile.objects.complete().exists())
+        self.assertFalse(CitizenProfile.objects.get().profile_complete)
+
+        self.fill_profile()
         self.profile.save()
-        
+
         self.assertTrue(self.profile.is_profile_complete())
+        self.assertEqual(CitizenProfile.objects.complete().get(), self.profile)
+
+        self.profile.city = ''
+        self.profile.save(update_fields=['city'])
+        self.assertFalse(CitizenProfile.objects.get().profile_complete)
     
+    def test_listing_defers_medical_notes(self):
+        """Test donor listings leave the medical text columns unloaded"""
+        profile = CitizenProfile.objects.for_listing().get()
+        self.assertEqual(profile.get_deferred_fields(),
+                         {'medical_conditions', 'allergies', 'regular_medications'})
+
+    def test_str_does_not_query_user(self):
+        """Test the default manager joins the user"""
+        profile = CitizenProfile.objects.get(pk=self.profile.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(profile), "testcitizen's Profile")
+
     def test_blood_group_choices(self):
         """Test valid blood group choices"""
+        field = CitizenProfile._meta.get_field('blood_group')
         valid_groups = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
         for group in valid_groups:
-            self.profile.blood_group = group
-            self.profile.save()
-            self.assertEqual(self.profile.blood_group, group)
+            with self.subTest(group=group):
+                # Raises ValidationError for anything outside the choices
+                field.validate(group, self.profile)
 
 
 class ServiceProviderProfileModelTests(TestCase):
     """Test ServiceProviderProfile model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='test_hospital',
             email='hospital@test.com',
             password='testpass123',
             phone_number='+8801712345678',
             user_type='service_provider'
         )
-        self.profile = ServiceProviderProfile.objects.create(
-            user=self.user,
+        cls.profile = ServiceProviderProfile.objects.create(
+            user=cls.user,
             organization_name='Test Hospital',
             service_type='hospital',
             email='hospital@test.com',
@@ -163,16 +242,52 @@ class ServiceProviderProfileModelTests(TestCase):
         self.profile.postal_code = '1212'
         self.profile.primary_contact_person = 'Dr. Smith'
         self.profile.emergency_hotline = '+8801712345679'
-        self.profile.save()
         
         self.assertTrue(self.profile.is_profile_complete())
 
 
+class EmergencyResponseModelTests(TestCase):
+    """Test EmergencyResponse model"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username='test_ambulance',
+            password='testpass123',
+            phone_number='+8801712345678',
+            user_type='service_provider'
+        )
+        provider = ServiceProviderProfile.objects.create(
+            user=user,
+            organization_name='Test Ambulance',
+            service_type='ambulance',
+            email='ambulance@test.com',
+            contact_number='+8801712345678'
+        )
+        cls.response = EmergencyResponse.objects.create(
+            service_provider=provider,
+            incident_id='INC-1',
+            response_time=12,
+            status='dispatched'
+        )
+
+    def test_set_status_completed(self):
+        """Test completing a response stamps completed_at in one UPDATE"""
+        with self.assertNumQueries(1):
+            self.response.set_status('completed')
+        self.assertIsNotNone(self.response.completed_at)
+
+        self.response.refresh_from_db()
+        self.assertEqual(self.response.status, 'completed')
+        self.assertIsNotNone(self.response.completed_at)
+
+
 class BloodRequestModelTests(TestCase):
     """Test BloodRequest model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             phone_number='+8801712345678',
             password='test123'
@@ -198,27 +313,9 @@ class BloodRequestModelTests(TestCase):
     
     def test_is_urgent(self):
         """Test urgency check"""
-        urgent_request = BloodRequest.objects.create(
-            requester_name='John Doe',
-            patient_name='Jane Doe',
-            blood_type_needed='O+',
-            location='Hospital',
-            contact_phone='+8801712345678',
-            urgency='urgent',
-            needed_by_date=date.today()
-        )
-        self.assertTrue(urgent_request.is_urgent())
-        
-        normal_request = BloodRequest.objects.create(
-            requester_name='John Doe',
-            patient_name='Jane Doe',
-            blood_type_needed='O+',
-            location='Hospital',
-            contact_phone='+8801712345679',
-            urgency='normal',
-            needed_by_date=date.today()
-        )
-        self.assertFalse(normal_request.is_urgent())
+        # is_urgent() only reads urgency, so the rows need not be saved
+        self.assertTrue(BloodRequest(urgency='urgent').is_urgent())
+        self.assertFalse(BloodRequest(urgency='normal').is_urgent())
 
 
 class CitizenRegistrationFormTests(TestCase):
@@ -248,6 +345,73 @@ class CitizenRegistrationFormTests(TestCase):
         form = CitizenRegistrationForm(data=form_data)
         self.assertFalse(form.is_valid())
 
+    def test_invalid_phone_number(self):
+        """Test form rejects a phone number with letters"""
+        form_data = {
+            'username': 'testcitizen',
+            'email': 'citizen@test.com',
+            'phone_number': '+880abc12345',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        }
+        form = CitizenRegistrationForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('phone_number', form.errors)
+
+    def test_hyphenated_phone_number_accepted(self):
+        """Test separators are allowed and stored in canonical form"""
+        form = CitizenRegistrationForm(data={
+            'username': 'testcitizen',
+            'email': 'citizen@test.com',
+            'phone_number': '+880-1712345678',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['phone_number'], '+8801712345678')
+
+    def test_spaced_phone_number_matches_existing(self):
+        """Test phone numbers are compared in canonical form"""
+        User.objects.create_user(
+            username='existing',
+            phone_number='+8801712345678',
+            password='test123'
+        )
+        for phone in ('+880 1712345678', '+880 1712-345678'):
+            with self.subTest(phone=phone):
+                form = CitizenRegistrationForm(data={
+                    'username': 'testcitizen',
+                    'email': 'citizen@test.com',
+                    'phone_number': phone,
+                    'password1': 'TestPass123!',
+                    'password2': 'TestPass123!'
+                })
+                self.assertFalse(form.is_valid())
+                self.assertEqual(form.errors['phone_number'],
+                                 ['User with this Phone number already exists.'])
+
+    def test_phone_number_length_checked_without_separators(self):
+        """Test the 15-character limit applies to the canonical number"""
+        form = CitizenRegistrationForm(data={
+            'username': 'testcitizen',
+            'email': 'citizen@test.com',
+            'phone_number': '+880 1712 3456789 0',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['phone_number'], [
+            'Ensure this phone number has at most 15 characters without separators (it has 16).'
+        ])
+
+    def test_widgets_styled_without_touching_parent_form(self):
+        """Test form-control is applied to every field but not to UserCreationForm"""
+        from django.contrib.auth.forms import UserCreationForm
+        form = CitizenRegistrationForm()
+        for field in form.fields.values():
+            self.assertEqual(field.widget.attrs['class'], 'form-control')
+        self.assertNotIn('class', UserCreationForm().fields['password1'].widget.attrs)
+
 
 class ServiceProviderRegistrationFormTests(TestCase):
     """Test ServiceProviderRegistrationForm"""
@@ -264,7 +428,93 @@ class ServiceProviderRegistrationFormTests(TestCase):
         }
         form = ServiceProviderRegistrationForm(data=form_data)
         self.assertTrue(form.is_valid())
-    
+
+    def test_contact_number_with_separators(self):
+        """Test the contact number is validated after separators are stripped"""
+        form = ServiceProviderRegistrationForm(data={
+            'organization_name': 'Test Hospital',
+            'service_type': 'hospital',
+            'email': 'hospital@test.com',
+            'contact_number': '+880 1712-345678',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['contact_number'], '+8801712345678')
+
+    def test_duplicate_hyphenated_organization(self):
+        """Test the uniqueness check uses the same username as save()"""
+        User.objects.create_user(
+            username='red_cross',
+            password='testpass123',
+            phone_number='+8801712345679'
+        )
+        form_data = {
+            'organization_name': 'Red-Cross',
+            'service_type': 'hospital',
+            'email': 'redcross@test.com',
+            'contact_number': '+8801712345678',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        }
+        form = ServiceProviderRegistrationForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('organization_name', form.errors)
+
+    def test_bulk_register(self):
+        """Test bulk registration creates users and profiles in bulk"""
+        records = [{
+            'organization_name': f'Bulk Hospital {i}',
+            'service_type': 'hospital',
+            'email': f'bulk{i}@test.com',
+            'contact_number': f'+88017123456{i}0',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        } for i in range(3)]
+        users = ServiceProviderRegistrationForm.bulk_register(records)
+        self.assertEqual([u.username for u in users],
+                         ['bulk_hospital_0', 'bulk_hospital_1', 'bulk_hospital_2'])
+        self.assertTrue(users[0].check_password('TestPass123!'))
+        self.assertEqual(ServiceProviderProfile.objects.filter(
+            user__user_type='service_provider').count(), 3)
+
+    def test_bulk_register_rejects_clashes_within_batch(self):
+        """Test repeated names or numbers fail validation, not the INSERT"""
+        record = {
+            'organization_name': 'Bulk Hospital',
+            'service_type': 'hospital',
+            'email': 'bulk@test.com',
+            'contact_number': '+8801712345670',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        }
+        with self.assertRaises(ValidationError) as cm:
+            ServiceProviderRegistrationForm.bulk_register([record, dict(record)])
+        self.assertEqual(cm.exception.messages, [
+            'Organization names repeated in this batch: bulk_hospital',
+            'Contact numbers repeated or already registered: +8801712345670',
+        ])
+        self.assertFalse(User.objects.exists())
+
+    def test_bulk_register_applies_save_logic(self):
+        """Test bulk_create still stores canonical phones and the completeness flag"""
+        records = [{
+            'organization_name': f'Bulk Hospital {i}',
+            'service_type': 'hospital',
+            'email': f'bulk{i}@test.com',
+            'contact_number': f'+880 1712-3456{i}0',
+            'password1': 'TestPass123!',
+            'password2': 'TestPass123!'
+        } for i in range(2)]
+        # Narrow the completeness rule to fields registration fills in
+        with mock.patch.object(ServiceProviderProfile, 'COMPLETENESS_FIELDS',
+                               ('organization_name', 'contact_number')):
+            ServiceProviderRegistrationForm.bulk_register(records)
+        profile = ServiceProviderProfile.objects.get(organization_name='Bulk Hospital 1')
+        self.assertEqual(profile.contact_number, '+8801712345610')
+        self.assertEqual(profile.user.phone_number, '+8801712345610')
+        self.assertTrue(profile.profile_complete)
+
     def test_others_service_type_validation(self):
         """Test validation when 'others' is selected"""
         form_data = {
@@ -287,21 +537,21 @@ class ServiceProviderRegistrationFormTests(TestCase):
 class CitizenViewTests(TestCase):
     """Test citizen views"""
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testcitizen',
             email='citizen@test.com',
             password='testpass123',
             phone_number='+8801712345678',
             user_type='citizen'
         )
-        self.profile = CitizenProfile.objects.create(
-            user=self.user,
+        cls.profile = CitizenProfile.objects.create(
+            user=cls.user,
             city='Dhaka',
             area_sector='Gulshan'
         )
-    
+
     def test_citizen_dashboard_requires_login(self):
         """Test dashboard requires authentication"""
         response = self.client.get(reverse('citizen_dashboard'))
@@ -309,11 +559,52 @@ class CitizenViewTests(TestCase):
     
     def test_citizen_dashboard_access(self):
         """Test authenticated access to dashboard"""
-        self.client.login(username='testcitizen', password='testpass123')
+        self.client.force_login(self.user)
         response = self.client.get(reverse('citizen_dashboard'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Dashboard')
-    
+
+    def test_citizen_dashboard_disaster_stats(self):
+        """Test disaster stats count every report, not just the latest five"""
+        disasters = [
+            Disaster.objects.create(
+                disaster_type='flood', severity='high', description='Test',
+                city='Dhaka', area_sector='Gulshan', incident_datetime=timezone.now(),
+                reporter=self.user, status='pending' if i < 2 else 'approved'
+            )
+            for i in range(6)
+        ]
+        DisasterAlert.objects.create(disaster=disasters[0], user=self.user, match_type='city')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('citizen_dashboard'))
+        self.assertEqual(response.context['disaster_stats'], {
+            'total': 6, 'pending': 2, 'approved': 4,
+            'alerts_received': 1, 'unread_alerts': 1,
+        })
+
+    def test_citizen_dashboard_blood_stats(self):
+        """Test blood request stats count every request, not just the latest five"""
+        for i in range(6):
+            BloodRequest.objects.create(
+                requester_name='John Doe',
+                patient_name=f'Patient {i}',
+                blood_type_needed='O+',
+                location='Hospital',
+                contact_phone='+8801712345678',
+                needed_by_date=date.today(),
+                status='fulfilled' if i == 0 else 'open',
+                created_by=self.user
+            )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('citizen_dashboard'))
+        stats = response.context['blood_stats']
+        self.assertEqual(
+            (stats['total_requests'], stats['open_requests'], stats['fulfilled_requests']),
+            (6, 5, 1)
+        )
+        self.assertEqual(len(response.context['user_blood_requests']), 5)
+        self.assertEqual(stats['last_request'].patient_name, 'Patient 5')
+
     def test_register_citizen_view(self):
         """Test citizen registration view"""
         response = self.client.get(reverse('register_citizen'))
@@ -335,17 +626,17 @@ class CitizenViewTests(TestCase):
 class ServiceProviderViewTests(TestCase):
     """Test service provider views"""
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='test_hospital',
             email='hospital@test.com',
             password='testpass123',
             phone_number='+8801712345678',
             user_type='service_provider'
         )
-        self.profile = ServiceProviderProfile.objects.create(
-            user=self.user,
+        cls.profile = ServiceProviderProfile.objects.create(
+            user=cls.user,
             organization_name='Test Hospital',
             service_type='hospital',
             email='hospital@test.com',
@@ -359,7 +650,7 @@ class ServiceProviderViewTests(TestCase):
             is_verified=True,
             current_status='active'
         )
-    
+
     def test_service_provider_dashboard_requires_login(self):
         """Test dashboard requires authentication"""
         response = self.client.get(reverse('service_provider_dashboard'))
@@ -367,47 +658,140 @@ class ServiceProviderViewTests(TestCase):
     
     def test_service_provider_dashboard_access(self):
         """Test authenticated access to dashboard"""
-        self.client.login(username='test_hospital', password='testpass123')
+        self.client.force_login(self.user)
         response = self.client.get(reverse('service_provider_dashboard'))
         self.assertEqual(response.status_code, 200)
-    
+
+    def test_service_provider_dashboard_disaster_stats(self):
+        """Test response counts cover every response, not just the latest five"""
+        for i in range(6):
+            disaster = Disaster.objects.create(
+                disaster_type='flood', severity='high', description='Test',
+                city='Dhaka' if i else 'Chittagong', area_sector='Gulshan',
+                incident_datetime=timezone.now(), reporter=self.user
+            )
+            DisasterResponse.objects.create(
+                disaster=disaster, service_provider=self.profile,
+                response_status='completed' if i == 1 else 'notified'
+            )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('service_provider_dashboard'))
+        self.assertEqual(response.context['disaster_stats'], {
+            'reported': 6, 'responded_to': 6, 'pending_responses': 4,
+        })
+
     def test_service_provider_directory(self):
         """Test public service provider directory"""
-        response = self.client.get(reverse('service_provider_directory'))
+        # Count, city filter options and the page of providers
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('service_provider_directory'))
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, 'Test Hospital')
+        self.assertIn(self.profile, response.context['page_obj'])
+        # The cards never touch the user, so it is neither joined nor loaded
+        provider = response.context['page_obj'][0]
+        self.assertFalse(ServiceProviderProfile.user.is_cached(provider))
     
     def test_service_provider_detail(self):
         """Test service provider detail view"""
-        response = self.client.get(
-            reverse('service_provider_detail', args=[self.profile.id])
-        )
+        # Provider, star breakdown and the latest reviews with their authors
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('service_provider_detail', args=[self.profile.id])
+            )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Test Hospital')
 
+    def test_quick_update(self):
+        """Test quick update saves the edited fields and bumps updated_at"""
+        self.profile.maximum_capacity = 100
+        self.profile.save()
+        updated_at = self.profile.updated_at
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('quick_update_service_provider'), {
+            'current_capacity': 40,
+            'contact_number': '+8801712345678',
+            'current_status': 'maintenance',
+            'operating_hours': '9-5',
+        })
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['capacity_percentage'], 40.0)
+        self.assertEqual(data['status'], 'Under Maintenance')
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.current_status, 'maintenance')
+        self.assertEqual(self.profile.organization_name, 'Test Hospital')
+        self.assertGreater(self.profile.updated_at, updated_at)
+
+    def test_quick_update_without_changes_skips_write(self):
+        """Test resending the current values leaves updated_at alone"""
+        updated_at = self.profile.updated_at
+        self.client.force_login(self.user)
+        # Session and user with its profile; nothing else is read or written
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('quick_update_service_provider'), {
+                'contact_number': '+8801712345678',
+                'current_status': 'active',
+                'operating_hours': '24/7',
+            })
+        self.assertTrue(response.json()['success'])
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.updated_at, updated_at)
+
 
 class BloodNetworkViewTests(TestCase):
     """Test blood network views"""
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123',
             phone_number='+8801712345678'
         )
-        self.profile = CitizenProfile.objects.create(
-            user=self.user,
+        cls.profile = CitizenProfile.objects.create(
+            user=cls.user,
             blood_group='A+',
             available_to_donate='yes',
             city='Dhaka',
             phone_number='+8801712345678'
         )
-    
+
     def test_blood_network_public_access(self):
         """Test blood network is publicly accessible"""
-        response = self.client.get(reverse('blood_network'))
+        # Open requests, city options and the donor page
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('blood_network'))
         self.assertEqual(response.status_code, 200)
+
+    def test_blood_network_queries_do_not_grow_with_rows(self):
+        """Test extra donors and requests add no per-row queries"""
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'donor{i}',
+                password='testpass123',
+                phone_number=f'+88017000000{i}0'
+            )
+            CitizenProfile.objects.create(
+                user=user,
+                blood_group='O+',
+                available_to_donate='yes',
+                city='Dhaka'
+            )
+            BloodRequest.objects.create(
+                requester_name='John Doe',
+                patient_name=f'Patient {i}',
+                blood_type_needed='O+',
+                location='Hospital',
+                contact_phone='+8801712345678',
+                needed_by_date=date.today(),
+                created_by=user
+            )
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('blood_network'))
+        self.assertEqual(len(response.context['active_requests']), 3)
+        self.assertContains(response, '4 Available Donors')
     
     def test_create_blood_request_anonymous(self):
         """Test anonymous user can create blood request"""
@@ -425,7 +809,23 @@ class BloodNetworkViewTests(TestCase):
         response = self.client.post(reverse('blood_network'), data=form_data)
         self.assertEqual(response.status_code, 302)  # Redirect after success
         self.assertTrue(BloodRequest.objects.filter(patient_name='Jane Doe').exists())
-    
+
+    def test_create_blood_request_records_citizen_city(self):
+        """Test a signed-in citizen's city comes from the profile loaded with the user"""
+        self.client.force_login(self.user)
+        # Session, user with its profile, and the INSERT
+        with self.assertNumQueries(3):
+            self.client.post(reverse('blood_network'), data={
+                'requester_name': 'John Doe',
+                'patient_name': 'Jane Doe',
+                'blood_type_needed': 'A+',
+                'location': 'Dhaka Medical College',
+                'contact_phone': '+8801712345678',
+                'urgency': 'urgent',
+                'needed_by_date': (date.today() + timedelta(days=1)).isoformat(),
+            })
+        self.assertEqual(BloodRequest.objects.get().requester_city, 'Dhaka')
+
     def test_blood_request_api(self):
         """Test blood request JSON API"""
         BloodRequest.objects.create(
@@ -449,16 +849,16 @@ class BloodNetworkViewTests(TestCase):
 class ServiceProviderRatingTests(TestCase):
     """Test service provider rating functionality"""
     
-    def setUp(self):
-        self.client = Client()
-        self.sp_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.sp_user = User.objects.create_user(
             username='hospital',
             password='test123',
             phone_number='+8801712345678',
             user_type='service_provider'
         )
-        self.sp_profile = ServiceProviderProfile.objects.create(
-            user=self.sp_user,
+        cls.sp_profile = ServiceProviderProfile.objects.create(
+            user=cls.sp_user,
             organization_name='Test Hospital',
             service_type='hospital',
             email='hospital@test.com',
@@ -471,13 +871,13 @@ class ServiceProviderRatingTests(TestCase):
             primary_contact_person='Dr. Smith',
             emergency_hotline='+8801712345679'
         )
-        self.citizen = User.objects.create_user(
+        cls.citizen = User.objects.create_user(
             username='citizen',
             password='test123',
             phone_number='+8801712345679',
             user_type='citizen'
         )
-    
+
     def test_create_rating(self):
         """Test creating a rating"""
         rating = ServiceProviderRating.objects.create(
@@ -496,30 +896,309 @@ class ServiceProviderRatingTests(TestCase):
             user=self.citizen,
             rating=5
         )
-        with self.assertRaises(Exception):
+        with self.assertRaises(IntegrityError):
             ServiceProviderRating.objects.create(
                 service_provider=self.sp_profile,
                 user=self.citizen,
                 rating=4
             )
 
+    def test_str_does_not_query_provider(self):
+        """Test the default manager joins the rated provider"""
+        ServiceProviderRating.objects.create(
+            service_provider=self.sp_profile, user=self.citizen, rating=4)
+        rating = ServiceProviderRating.objects.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(str(rating), '4 stars for Test Hospital')
+
+    def test_rating_summaries(self):
+        """Test directory and detail pages show aggregated ratings"""
+        ServiceProviderRating.objects.create(
+            service_provider=self.sp_profile, user=self.citizen, rating=4)
+        ServiceProviderRating.objects.create(
+            service_provider=self.sp_profile, user=self.sp_user, rating=5)
+        self.sp_profile.current_status = 'active'
+        self.sp_profile.save()
+
+        response = self.client.get(reverse('service_provider_directory'))
+        provider = response.context['page_obj'][0]
+        self.assertEqual((provider.avg_rating, provider.rating_count), (4.5, 2))
+
+        response = self.client.get(
+            reverse('service_provider_detail', args=[self.sp_profile.id]))
+        self.assertEqual(response.context['total_ratings'], 2)
+        self.assertEqual(response.context['rating_counts'][4], 1)
+        self.assertContains(response, 'citizen')
+
+    def test_cached_ratings_follow_changes(self):
+        """Test saving and deleting ratings refreshes the provider aggregates"""
+        rating = ServiceProviderRating.objects.create(
+            service_provider=self.sp_profile, user=self.citizen, rating=2)
+        rating.rating = 4
+        rating.save()
+        self.sp_profile.refresh_from_db()
+        self.assertEqual((self.sp_profile.avg_rating, self.sp_profile.rating_count), (4, 1))
+
+        rating.delete()
+        self.sp_profile.refresh_from_db()
+        self.assertEqual((self.sp_profile.avg_rating, self.sp_profile.rating_count), (0, 0))
+
+    def test_deleting_provider_skips_rating_refresh(self):
+        """Test the ratings cascade doesn't recompute the provider being deleted"""
+        for user in (self.citizen, self.sp_user):
+            ServiceProviderRating.objects.create(
+                service_provider=self.sp_profile, user=user, rating=4)
+        with CaptureQueriesContext(connection) as queries:
+            self.sp_user.delete()
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE')
+                          and '"avg_rating"' in q['sql']])
+        self.assertFalse(ServiceProviderRating.objects.exists())
+
+    def test_deleting_rater_refreshes_other_providers(self):
+        """Test ratings removed with their author still update the rated provider"""
+        ServiceProviderRating.objects.create(
+            service_provider=self.sp_profile, user=self.citizen, rating=4)
+        self.citizen.delete()
+        self.sp_profile.refresh_from_db()
+        self.assertEqual((self.sp_profile.avg_rating, self.sp_profile.rating_count), (0, 0))
+
+    def test_rating_form_star_labels(self):
+        """Test the rating form renders star labels"""
+        choices = dict(ServiceProviderRatingForm().fields['rating'].choices)
+        self.assertEqual(choices[1], '1 Star')
+        self.assertEqual(choices[5], '5 Stars')
+
+
+class ProfileModelBackendTests(TestCase):
+    """Test the session user is loaded with its profile"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testcitizen',
+            password='testpass123',
+            phone_number='+8801712345678',
+            user_type='citizen'
+        )
+        CitizenProfile.objects.create(user=cls.user, city='Dhaka')
+
+    def test_profile_loaded_with_user(self):
+        """Test both profile accessors are answered without more queries"""
+        with self.assertNumQueries(1):
+            user = ProfileModelBackend().get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.citizen_profile.city, 'Dhaka')
+            self.assertFalse(hasattr(user, 'service_provider_profile'))
+
+    def test_existing_model_backend_session_moved(self):
+        """Test the migration keeps sessions created before the backend change"""
+        migration = import_module('accounts.migrations.0022_move_sessions_to_profile_backend')
+        self.client.force_login(self.user, backend=migration.OLD_BACKEND)
+        migration.move_sessions_to_profile_backend(global_apps, None)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], migration.NEW_BACKEND)
+        response = self.client.get(reverse('citizen_dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_failed_login_hashes_once(self):
+        """Test a wrong password runs the hasher once, not per backend"""
+        with mock.patch.object(MD5PasswordHasher, 'verify', autospec=True,
+                               side_effect=MD5PasswordHasher.verify) as verify:
+            self.assertIsNone(authenticate(username='testcitizen', password='wrong'))
+        self.assertEqual(verify.call_count, 1)
+
+    def test_inactive_user_rejected(self):
+        """Test inactive users are still turned away"""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(ProfileModelBackend().get_user(self.user.pk))
+
 
 class LogoutViewTests(TestCase):
     """Test logout functionality"""
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             password='test123',
             phone_number='+8801712345678'
         )
-    
+
     def test_logout(self):
         """Test user logout"""
-        self.client.login(username='testuser', password='test123')
+        self.client.force_login(self.user)
         response = self.client.get(reverse('logout'))
         self.assertEqual(response.status_code, 302)  # Redirect to homepage
         # Verify user is logged out
         response = self.client.get(reverse('citizen_dashboard'))
-        self.assertEqual(response.status_code, 302)  # Redirect to login
\ No newline at end of file
+        self.assertEqual(response.status_code, 302)  # Redirect to login
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class CachedCountPaginatorTests(TestCase):
+    """Test cached provider counts used by the admin changelist and directory"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='test_hospital',
+            password='testpass123',
+            phone_number='+8801712345678',
+            user_type='service_provider'
+        )
+        ServiceProviderProfile.objects.create(
+            user=cls.user,
+            organization_name='Test Hospital',
+            service_type='hospital',
+            email='hospital@test.com',
+            contact_number='+8801712345678'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        """Test a second paginator reuses the cached count"""
+        queryset = ServiceProviderProfile.objects.order_by('pk')
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+
+    def test_save_invalidates_count(self):
+        """Test saving a provider expires the cached count"""
+        queryset = ServiceProviderProfile.objects.order_by('pk')
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+
+        user = User.objects.create_user(
+            username='test_ambulance',
+            password='testpass123',
+            phone_number='+8801712345679',
+            user_type='service_provider'
+        )
+        ServiceProviderProfile.objects.create(
+            user=user,
+            organization_name='Test Ambulance',
+            service_type='ambulance',
+            email='ambulance@test.com',
+            contact_number='+8801712345679'
+        )
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 2)
+
+    def test_admin_bulk_update_invalidates_count(self):
+        """Test the admin's update()-based actions expire the cached count"""
+        queryset = ServiceProviderProfile.objects.filter(is_verified=True).order_by('pk')
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 0)
+
+        model_admin = ServiceProviderProfileAdmin(ServiceProviderProfile, admin.site)
+        model_admin._update_selected(ServiceProviderProfile.objects.all(), is_verified=True)
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+
+    def test_directory_reuses_cached_count(self):
+        """Test a repeat directory request skips the COUNT and city queries"""
+        ServiceProviderProfile.objects.update(is_verified=True, current_status='active', city='Dhaka')
+        url = reverse('service_provider_directory')
+        with self.assertNumQueries(3):
+            self.client.get(url, {'city': 'Dhaka'})
+        # Only the page itself
+        with self.assertNumQueries(1):
+            self.client.get(url, {'city': 'Dhaka'})
+
+    def test_directory_cities_expire_on_save(self):
+        """Test the cached city list picks up a saved provider"""
+        self.assertEqual(ServiceProviderProfile.directory_cities(), [])
+        profile = ServiceProviderProfile.objects.get()
+        profile.is_verified = True
+        profile.city = 'Dhaka'
+        profile.save()
+        self.assertEqual(ServiceProviderProfile.directory_cities(), ['Dhaka'])
+        with self.assertNumQueries(0):
+            ServiceProviderProfile.directory_cities()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class BloodRequestOpenFeedTests(TestCase):
+    """Test the cached public feed of open blood requests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.request = BloodRequest.objects.create(
+            requester_name='John Doe',
+            patient_name='Jane Doe',
+            blood_type_needed='A+',
+            location='Dhaka Medical College',
+            contact_phone='+8801712345678',
+            urgency='urgent',
+            needed_by_date=date.today() + timedelta(days=1)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_is_cached_until_a_request_changes(self):
+        """Test repeat reads hit the cache and saves expire it"""
+        self.assertEqual(BloodRequest.open_feed(), [self.request])
+        with self.assertNumQueries(0):
+            self.assertEqual(BloodRequest.open_feed(2), [self.request])
+
+        self.request.status = 'fulfilled'
+        self.request.save()
+        self.assertEqual(BloodRequest.open_feed(), [])
+
+
+class ServiceProviderAdminTests(TestCase):
+    """Test ServiceProviderProfileAdmin changelist"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin',
+            password='adminpass123',
+            email='admin@test.com',
+            phone_number='+8801700000000'
+        )
+
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'provider{i}',
+                password='testpass123',
+                phone_number=f'+88017123456{i}0',
+                user_type='service_provider'
+            )
+            provider = ServiceProviderProfile.objects.create(
+                user=user,
+                organization_name=f'Provider {i}',
+                service_type='hospital',
+                email=f'provider{i}@test.com',
+                contact_number=f'+88017123456{i}0'
+            )
+            ServiceProviderRating.objects.create(
+                service_provider=provider, user=cls.admin, rating=i + 3
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_shows_cached_ratings(self):
+        """Test ratings come from the cached columns"""
+        response = self.client.get(reverse('admin:accounts_serviceproviderprofile_changelist'))
+        self.assertEqual(response.status_code, 200)
+        ratings = sorted(p.avg_rating for p in response.context['cl'].result_list)
+        self.assertEqual(ratings, [3, 4, 5])
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    })
+    def test_warm_changelist_skips_count(self):
+        """Test a repeat changelist load runs no COUNT query"""
+        cache.clear()
+        url = reverse('admin:accounts_serviceproviderprofile_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        counts = [q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql']]
+        self.assertEqual(counts, [])
@@ -1,23 +1,20 @@
-from django.db import IntegrityError
+from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.db.models import Q, Avg
+from django.db.models import Count, Q
 from datetime import date, datetime
-from .forms import CitizenProfileForm
-from .models import CitizenProfile
 from .forms import (
     CitizenRegistrationForm, ServiceProviderRegistrationForm,
     CitizenProfileForm, ServiceProviderProfileForm, QuickUpdateForm,
     ServiceProviderRatingForm
 )
-from .models import CitizenProfile, ServiceProviderProfile, ServiceProviderRating, BloodRequest
+from .models import CitizenProfile, ServiceProviderProfile, BloodRequest
+from .pagination import CachedCountPaginator
 
 from disasters.models import Disaster, DisasterAlert
-from django.db.models import Count, Q
 
 
 def register_choice(request):
@@ -30,9 +27,9 @@ def register_citizen(request):
         if form.is_valid():
             user = form.save(commit=False)
             user.user_type = 'citizen'
-            user.save()
-
-            CitizenProfile.objects.create(user=user)
+            with transaction.atomic():
+                user.save()
+                CitizenProfile.objects.create(user=user)
             login(request, user)
             return redirect('homepage')
     else:
@@ -59,14 +56,16 @@ def citizen_dashboard(request):
     user_disasters = Disaster.objects.filter(
         reporter=request.user).order_by('-created_at')[:5]
 
-    # Get disaster statistics
-    disaster_stats = {
-        'total': user_disasters.count(),
-        'pending': Disaster.objects.filter(reporter=request.user, status='pending').count(),
-        'approved': Disaster.objects.filter(reporter=request.user, status='approved').count(),
-        'alerts_received': DisasterAlert.objects.filter(user=request.user).count(),
-        'unread_alerts': DisasterAlert.objects.filter(user=request.user, is_read=False).count(),
-    }
+    # Get disaster statistics, one aggregate per table
+    disaster_stats = Disaster.objects.filter(reporter=request.user).aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        approved=Count('id', filter=Q(status='approved')),
+    )
+    disaster_stats.update(DisasterAlert.objects.filter(user=request.user).aggregate(
+        alerts_received=Count('id'),
+        unread_alerts=Count('id', filter=Q(is_read=False)),
+    ))
 
     # Get nearby disasters (same city)
     nearby_disasters = Disaster.objects.filter(
@@ -75,15 +74,20 @@ def citizen_dashboard(request):
     ).exclude(reporter=request.user).order_by('-created_at')[:3]
 
 # SPRINT 4: Add blood network activity
-    user_blood_requests = BloodRequest.objects.filter(
+    user_blood_requests = list(BloodRequest.objects.filter(
         created_by=request.user
-    ).order_by('-created_at')[:5]
+    ).order_by('-created_at')[:5])
+    blood_counts = BloodRequest.objects.filter(created_by=request.user).aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(status='open')),
+        fulfilled=Count('id', filter=Q(status='fulfilled')),
+    )
 
     blood_stats = {
-        'total_requests': user_blood_requests.count(),
-        'open_requests': BloodRequest.objects.filter(created_by=request.user, status='open').count(),
-        'fulfilled_requests': BloodRequest.objects.filter(created_by=request.user, status='fulfilled').count(),
-        'last_request': user_blood_requests.first() if user_blood_requests.exists() else None,
+        'total_requests': blood_counts['total'],
+        'open_requests': blood_counts['open'],
+        'fulfilled_requests': blood_counts['fulfilled'],
+        'last_request': user_blood_requests[0] if user_blood_requests else None,
         'is_donor': profile.available_to_donate == 'yes' if profile else False,
         'blood_group': profile.blood_group if profile else None,
     }
@@ -139,20 +143,6 @@ def citizen_profile_update(request):
     return render(request, 'accounts/citizen_profile_setup.html', context)
 
 
-def register_service_provider(request):
-    if request.method == 'POST':
-        form = ServiceProviderRegistrationForm(request.POST)
-        if form.is_valid():
-            user = form.save(commit=False)
-            user.user_type = 'service_provider'
-            user.save()
-            login(request, user)
-            return redirect('homepage')
-    else:
-        form = ServiceProviderRegistrationForm()
-    return render(request, 'accounts/register_service_provider.html', {'form': form})
-
-
 def logout_view(request):
     logout(request)
     return redirect('homepage')
@@ -263,24 +253,21 @@ def service_provider_dashboard(request):
         response_count=Count('responses')
     ).order_by('response_count', '-created_at')[:5]
 
-    # Calculate average rating
-    avg_rating = profile.ratings.aggregate(avg_rating=Avg('rating'))[
-        'avg_rating'] or 0
-    total_ratings = profile.ratings.count()
-
     # Get capacity percentage
     capacity_percentage = profile.get_capacity_percentage()
 
-    # Disaster statistics
+    # Disaster statistics; a provider responds to a disaster at most once,
+    # so both response counts come from one pass over its responses
     disaster_stats = {
         'reported': Disaster.objects.filter(reporter=request.user).count(),
-        'responded_to': disaster_responses.count(),
-        'pending_responses': Disaster.objects.filter(
-            status='approved',
-            city=profile.city,
-            responses__service_provider=profile,
-            responses__response_status__in=['notified', 'responding']
-        ).count()
+        **profile.disaster_responses.aggregate(
+            responded_to=Count('id'),
+            pending_responses=Count('id', filter=Q(
+                disaster__status='approved',
+                disaster__city=profile.city,
+                response_status__in=['notified', 'responding']
+            )),
+        ),
     }
 
     return render(request, 'accounts/service_provider_dashboard.html', {
@@ -288,8 +275,8 @@ def service_provider_dashboard(request):
         'recent_responses': recent_responses,
         'disaster_responses': disaster_responses,
         'nearby_disasters': nearby_disasters,
-        'avg_rating': avg_rating,
-        'total_ratings': total_ratings,
+        'avg_rating': round(profile.avg_rating, 1),
+        'total_ratings': profile.rating_count,
         'capacity_percentage': capacity_percentage,
         'disaster_stats': disaster_stats,
     })
@@ -301,6 +288,8 @@ def quick_update_service_provider(request):
     if request.user.user_type != 'service_provider':
         return JsonResponse({'error': 'Access denied'}, status=403)
 
+    # Loaded along with request.user by ProfileModelBackend, so the JSON
+    # reply below reads fields already in memory
     try:
         profile = request.user.service_provider_profile
     except ServiceProviderProfile.DoesNotExist:
@@ -309,7 +298,10 @@ def quick_update_service_provider(request):
     if request.method == 'POST':
         form = QuickUpdateForm(request.POST, instance=profile)
         if form.is_valid():
-            form.save()
+            # Status feeds resend unchanged values; only write real changes
+            if form.has_changed():
+                form.save(commit=False).save(
+                    update_fields=[*form.changed_data, 'updated_at'])
             return JsonResponse({
                 'success': True,
                 'message': 'Information updated successfully',
@@ -328,10 +320,14 @@ def quick_update_service_provider(request):
 
 def service_provider_directory(request):
     """Public Service Provider Directory"""
-    providers = ServiceProviderProfile.objects.filter(
+    # equipment_available is only shown on the detail page, and the cards
+    # never show the account, so skip the default user join
+    providers = ServiceProviderProfile.objects.select_related(None).defer(
+        'equipment_available'
+    ).filter(
         is_verified=True,
         current_status='active'
-    ).select_related('user').prefetch_related('ratings')
+    )
 
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -350,23 +346,13 @@ def service_provider_directory(request):
     if city_filter:
         providers = providers.filter(city__icontains=city_filter)
 
-    # Add average rating to each provider
-    for provider in providers:
-        provider.avg_rating = provider.ratings.aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating'] or 0
-        provider.total_ratings = provider.ratings.count()
-
-    # Pagination
-    paginator = Paginator(providers, 12)  # 12 providers per page
+    # Pagination; the COUNT is cached per filter combination
+    paginator = CachedCountPaginator(providers, 12)  # 12 providers per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     # Get filter options
     service_types = ServiceProviderProfile.SERVICE_TYPE_CHOICES
-    cities = ServiceProviderProfile.objects.filter(
-        is_verified=True
-    ).values_list('city', flat=True).distinct().exclude(city='')
 
     context = {
         'page_obj': page_obj,
@@ -374,8 +360,8 @@ def service_provider_directory(request):
         'service_type_filter': service_type_filter,
         'city_filter': city_filter,
         'service_types': service_types,
-        'cities': sorted(cities),
-        'total_providers': providers.count()
+        'cities': ServiceProviderProfile.directory_cities(),
+        'total_providers': paginator.count  # same cached COUNT the page used
     }
 
     return render(request, 'accounts/service_provider_directory.html', context)
@@ -384,18 +370,16 @@ def service_provider_directory(request):
 def service_provider_detail(request, provider_id):
     """Service Provider Detail View"""
     provider = get_object_or_404(
-        ServiceProviderProfile.objects.select_related(
-            'user').prefetch_related('ratings__user'),
+        ServiceProviderProfile,
         id=provider_id,
         is_verified=True
     )
 
-    # Calculate ratings
-    ratings = provider.ratings.all().order_by('-created_at')
-    avg_rating = ratings.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-    rating_counts = {}
-    for i in range(1, 6):
-        rating_counts[i] = ratings.filter(rating=i).count()
+    # Star breakdown in one pass; reviews are listed with their author
+    ratings = provider.ratings.select_related('user').order_by('-created_at')
+    stars = ratings.aggregate(
+        **{f'stars_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)})
+    rating_counts = {i: stars[f'stars_{i}'] for i in range(1, 6)}
 
     # Check if current user has already rated
     user_rating = None
@@ -421,8 +405,8 @@ def service_provider_detail(request, provider_id):
 
     context = {
         'provider': provider,
-        'avg_rating': round(avg_rating, 1),
-        'total_ratings': ratings.count(),
+        'avg_rating': round(provider.avg_rating, 1),
+        'total_ratings': provider.rating_count,
         'rating_counts': rating_counts,
         'ratings': ratings[:10],  # Show latest 10 ratings
         'user_rating': user_rating,
@@ -496,7 +480,7 @@ def blood_network(request):
     emergency_only = request.GET.get('emergency_only', '') == 'true'
 
     # Get available donors (public data)
-    donors = CitizenProfile.objects.filter(
+    donors = CitizenProfile.objects.for_listing().filter(
         available_to_donate='yes'
     ).select_related('user').exclude(
         blood_group__in=['', None]  # Exclude donors without blood group
@@ -513,14 +497,8 @@ def blood_network(request):
         donors = donors.filter(emergency_donor=True)
 
     # Get active blood requests (public) - for Sprint 3
-    active_requests = BloodRequest.objects.filter(
-        status='open'
-    ).order_by('-urgency', '-created_at')[:10]  # Latest 10
+    active_requests = BloodRequest.open_feed(10)  # Latest 10
 
-    # Get cities for filter dropdown (public)
-    cities = CitizenProfile.objects.filter(
-        available_to_donate='yes'
-    ).exclude(city__in=['', None]).values_list('city', flat=True).distinct()
     # Auto-fill data for logged-in users
     auto_fill = {}
     if request.user.is_authenticated:
@@ -551,10 +529,10 @@ def blood_network(request):
         ).order_by('-created_at')[:5]  # Latest 5
 
     context = {
-        'donors': donors[:20],  # Limit to 20 donors for performance
+        'donors': list(donors[:20]),  # Limit to 20 donors for performance
         'active_requests': active_requests,
         'user_requests': user_requests,
-        'cities': sorted(set(cities)),
+        'cities': CitizenProfile.donor_cities(),  # filter dropdown
         'auto_fill': auto_fill,
         'blood_types': BloodRequest.BLOOD_TYPE_CHOICES,
         'today': date.today(),
@@ -572,9 +550,7 @@ def blood_network(request):
 
 def get_recent_blood_requests_json(request):
     """Simple API to get recent blood requests as JSON"""
-    recent_requests = BloodRequest.objects.filter(
-        status='open'
-    ).order_by('-urgency', '-created_at')[:2]
+    recent_requests = BloodRequest.open_feed(2)
 
     data = []
     for req in recent_requests:
@@ -30,6 +30,7 @@ class DisasterResponseInline(admin.TabularInline):
     extra = 0
     readonly_fields = ('created_at', 'updated_at')
     fields = ('service_provider', 'response_status', 'response_notes', 'created_at')
+    raw_id_fields = ('service_provider',)
 
 
 class DisasterUpdateInline(admin.TabularInline):
@@ -37,6 +38,7 @@ class DisasterUpdateInline(admin.TabularInline):
     extra = 0
     readonly_fields = ('created_at',)
     fields = ('updated_by', 'update_type', 'notes', 'created_at')
+    raw_id_fields = ('updated_by',)
 
 
 @admin.register(Disaster)
@@ -26,11 +26,11 @@ class DisasterForm(forms.ModelForm):
 
     class Meta:
         model = Disaster
-        fields = [
+        fields = (
             'title', 'disaster_type', 'severity', 'description',
             'city', 'area_sector', 'specific_address', 'landmarks',
             'incident_date', 'incident_time', 'emergency_contact'
-        ]
+        )
 
         widgets = {
             'title': forms.TextInput(attrs={
@@ -167,7 +167,7 @@ class DisasterForm(forms.ModelForm):
 class DisasterImageForm(forms.ModelForm):
     class Meta:
         model = DisasterImage
-        fields = ['image', 'caption', 'is_primary']
+        fields = ('image', 'caption', 'is_primary')
         widgets = {
             'image': forms.FileInput(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-red-500 focus:border-transparent',
@@ -267,7 +267,7 @@ class DisasterFilterForm(forms.Form):
 class DisasterResponseForm(forms.ModelForm):
     class Meta:
         model = DisasterResponse
-        fields = ['response_status', 'response_notes', 'estimated_arrival']
+        fields = ('response_status', 'response_notes', 'estimated_arrival')
         widgets = {
             'response_status': forms.Select(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-green-500 focus:border-transparent'
@@ -293,7 +293,7 @@ class DisasterResponseForm(forms.ModelForm):
 class DisasterReportForm(forms.ModelForm):
     class Meta:
         model = DisasterReport
-        fields = ['reason', 'description']
+        fields = ('reason', 'description')
         widgets = {
             'reason': forms.Select(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-red-500 focus:border-transparent'
@@ -317,7 +317,7 @@ class AdminDisasterForm(forms.ModelForm):
 
     class Meta:
         model = Disaster
-        fields = ['status', 'rejection_reason']
+        fields = ('status', 'rejection_reason')
         widgets = {
             'status': forms.Select(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-200 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent'
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('disasters', '0005_alter_disaster_title'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='disaster',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('pending', 'Pending Review'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('resolved', 'Resolved'), ('cancelled', 'Cancelled')], default='approved', max_length=15),
+        ),
+    ]
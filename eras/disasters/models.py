@@ -1,7 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from PIL import Image
 import os
 
 User = get_user_model()
@@ -204,6 +203,9 @@ class DisasterImage(models.Model):
 
         # Resize image if too large
         if self.image:
+            # Pillow is only needed here; keep it off the models import path
+            from PIL import Image
+
             img = Image.open(self.image.path)
             if img.height > 800 or img.width > 800:
                 img.thumbnail((800, 800), Image.Resampling.LANCZOS)
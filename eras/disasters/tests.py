@@ -1,4 +1,4 @@
-from django.test import TestCase, Client
+from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -440,7 +440,6 @@ class DisasterViewTests(TestCase):
     """Test disaster views"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='testuser',
             password='test123',
@@ -556,7 +555,6 @@ class ServiceProviderResponseViewTests(TestCase):
     """Test service provider response views"""
     
     def setUp(self):
-        self.client = Client()
         self.citizen = User.objects.create_user(
             username='citizen',
             password='test123',
@@ -620,7 +618,6 @@ class CitizenNearbyDisastersViewTests(TestCase):
     """Test citizen nearby disasters view"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='citizen',
             password='test123',
@@ -681,7 +678,6 @@ class DisasterFilterTests(TestCase):
     """Test disaster filtering"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -741,7 +737,6 @@ class DisasterSearchTests(TestCase):
     """Test disaster search functionality"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -781,7 +776,6 @@ class AdminDisasterViewTests(TestCase):
     """Test admin disaster management views"""
     
     def setUp(self):
-        self.client = Client()
         self.admin = User.objects.create_superuser(
             username='admin',
             password='admin123',
@@ -888,12 +882,32 @@ class DisasterAlertSystemTests(TestCase):
             ).exists()
         )
 
+    def test_alerts_sent_once_in_fixed_queries(self):
+        """Test alerting runs a fixed number of queries and skips repeats"""
+        disaster = Disaster.objects.create(
+            disaster_type='flood',
+            severity='high',
+            description='Flood',
+            city='Dhaka',
+            area_sector='Gulshan',
+            incident_datetime=timezone.now(),
+            reporter=self.reporter,
+            status='approved'
+        )
+
+        from disasters.views import send_disaster_alerts
+        # Citizen and provider lookups, then one INSERT
+        with self.assertNumQueries(3):
+            self.assertEqual(send_disaster_alerts(disaster), 2)
+        self.assertEqual(
+            DisasterAlert.objects.get(user=self.citizen1).match_type, 'exact')
+        self.assertEqual(send_disaster_alerts(disaster), 0)
+
 
 class DisasterReportingTests(TestCase):
     """Test disaster reporting functionality"""
     
     def setUp(self):
-        self.client = Client()
         self.reporter = User.objects.create_user(
             username='reporter',
             password='test123',
@@ -954,7 +968,6 @@ class APIEndpointTests(TestCase):
     """Test API endpoints"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -1154,7 +1167,6 @@ class DisasterPaginationTests(TestCase):
     """Test disaster pagination"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -1269,7 +1281,6 @@ class DisasterDeleteTests(TestCase):
     """Test disaster deletion"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -1344,7 +1355,6 @@ class DisasterViewCountTests(TestCase):
     """Test disaster view count increment"""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(
             username='user',
             password='test123',
@@ -9,6 +9,7 @@ from django.views.decorators.http import require_http_methods
 from django.forms import formset_factory
 from django.db import transaction
 import json
+from itertools import chain
 
 from .models import (
     Disaster, DisasterImage, DisasterAlert, DisasterUpdate,
@@ -644,58 +645,48 @@ def mark_resolved(request, disaster_id):
 
 # ===== UTILITY FUNCTIONS =====
 
-def send_disaster_alerts(disaster):
-    """Send alerts to matching users when disaster is approved"""
-    from django.db.models import Q
-
-    # Get all users with profiles in the same location
-    citizen_profiles = CitizenProfile.objects.filter(
-        city=disaster.city
-    ).select_related('user')
-
-    service_profiles = ServiceProviderProfile.objects.filter(
-        city=disaster.city
-    ).select_related('user')
-
-    alerts_to_create = []
-
-    # Process citizen profiles
-    for profile in citizen_profiles:
-        match_type = 'city'
-        if profile.area_sector == disaster.area_sector:
-            match_type = 'exact'
-        elif disaster.severity == 'critical':
-            match_type = 'critical'
+ALERT_BATCH_SIZE = 500
 
-        # Create alert if not already exists
-        if not DisasterAlert.objects.filter(disaster=disaster, user=profile.user).exists():
-            alerts_to_create.append(DisasterAlert(
-                disaster=disaster,
-                user=profile.user,
-                match_type=match_type
-            ))
 
-    # Process service provider profiles
-    for profile in service_profiles:
+def send_disaster_alerts(disaster):
+    """Send alerts to matching users when disaster is approved"""
+    # Users in the same city, skipping anyone already alerted. Only the
+    # user id and area are needed, so no profile or user rows are built,
+    # and rows are streamed so memory stays flat for city-wide alerts.
+    already_alerted = DisasterAlert.objects.filter(
+        disaster=disaster).values('user_id')
+    recipients = chain(*(
+        model.objects.filter(city=disaster.city)
+        .exclude(user_id__in=already_alerted)
+        .values_list('user_id', 'area_sector')
+        .iterator(chunk_size=2000)
+        for model in (CitizenProfile, ServiceProviderProfile)
+    ))
+
+    sent = 0
+    batch = []
+    for user_id, area_sector in recipients:
         match_type = 'city'
-        if profile.area_sector == disaster.area_sector:
+        if area_sector == disaster.area_sector:
             match_type = 'exact'
         elif disaster.severity == 'critical':
             match_type = 'critical'
 
-        # Create alert if not already exists
-        if not DisasterAlert.objects.filter(disaster=disaster, user=profile.user).exists():
-            alerts_to_create.append(DisasterAlert(
-                disaster=disaster,
-                user=profile.user,
-                match_type=match_type
-            ))
-
-    # Bulk create alerts
-    if alerts_to_create:
-        DisasterAlert.objects.bulk_create(alerts_to_create, ignore_conflicts=True)
-
-    return len(alerts_to_create)
+        batch.append(DisasterAlert(
+            disaster=disaster,
+            user_id=user_id,
+            match_type=match_type
+        ))
+        if len(batch) == ALERT_BATCH_SIZE:
+            DisasterAlert.objects.bulk_create(batch, ignore_conflicts=True)
+            sent += len(batch)
+            batch = []
+
+    if batch:
+        DisasterAlert.objects.bulk_create(batch, ignore_conflicts=True)
+        sent += len(batch)
+
+    return sent
 
 
 @login_required
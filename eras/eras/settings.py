@@ -142,6 +142,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 AUTH_USER_MODEL = 'accounts.User'
+# Sessions stored against ModelBackend are moved over by accounts migration 0022
+AUTHENTICATION_BACKENDS = ['accounts.backends.ProfileModelBackend']
 # Login/Logout redirects
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
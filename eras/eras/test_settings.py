@@ -32,8 +32,17 @@ PASSWORD_HASHERS = [
 # Disable logging during tests
 LOGGING_CONFIG = None
 
-# Use in-memory file storage for tests
-DEFAULT_FILE_STORAGE = 'django.core.files.storage.InMemoryStorage'
+# Uploads stay on disk under MEDIA_ROOT since DisasterImage.save() opens
+# image.path; static files use plain storage so rendering {% static %}
+# doesn't need a collectstatic manifest
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 # Disable cache during tests
 CACHES = {
@@ -7,12 +7,10 @@ def homepage(request):
     Homepage view with blood network data for Sprint 5
     """
     # Get recent blood requests (2 most recent urgent requests)
-    recent_blood_requests = BloodRequest.objects.filter(
-        status='open'
-    ).order_by('-urgency', '-created_at')[:2]
+    recent_blood_requests = BloodRequest.open_feed(2)
 
     # Get active donors (4 most recent active donors with blood group)
-    active_donors = CitizenProfile.objects.filter(
+    active_donors = CitizenProfile.objects.for_listing().filter(
         available_to_donate='yes'
     ).exclude(
         blood_group__in=['', None]  # Exclude donors without blood group